@@ -4,15 +4,14 @@
 from __future__ import annotations
 
 import os
-import json
 import asyncio
 from collections import defaultdict
-import aiosqlite
+from functools import lru_cache
 import discord
 from discord import app_commands
 
 # --- Internal modules (keep your package names) ---
-# fmt must provide: bold, code, block, score_sets, display_name_or_cached, mention (optional)
+# fmt must provide: bold, code, block, score_sets, display_name_or_cached, resolve_names_batch, mention (optional)
 import fmt
 from feather_rank import db
 from feather_rank.rules import match_winner, valid_set, set_finished
@@ -124,7 +123,7 @@ def _get_bot_id() -> int | None:
 
 def _parse_team_ids(team_str: str) -> list[int]:
     """Parse comma-separated team IDs string into list of integers."""
-    return [int(x) for x in team_str.split(",") if x]
+    return list(map(int, filter(None, team_str.split(","))))
 
 def _create_guest_player(user_id: int) -> dict:
     """Create a guest player dictionary for the bot with default guest rating."""
@@ -137,18 +136,8 @@ def _create_guest_player(user_id: int) -> dict:
     }
 
 # --- Helpers ---
-async def has_accepted_tos_safe(user_id: int) -> bool:
-    """Check ToS acceptance; if table missing, create schema and retry."""
-    try:
-        return await db.has_accepted_tos(user_id)
-    except aiosqlite.OperationalError as e:
-        if "no such table: tos_acceptances" in str(e):
-            await db.init_db(DATABASE_PATH)
-            return await db.has_accepted_tos(user_id)
-        raise
-
 async def require_tos(inter: discord.Interaction) -> bool:
-    if not await has_accepted_tos_safe(inter.user.id):
+    if not await db.has_accepted_tos(inter.user.id):
         await inter.response.send_message(
             "❗ Please run /agree_tos first to accept the Terms of Service.",
             ephemeral=True
@@ -161,10 +150,7 @@ async def _names(bot: discord.Client, guild: discord.Guild | None, ids: list[int
     
     Returns display names (not mentions) to avoid pinging users in scoreboard messages.
     """
-    parts = []
-    for uid in ids:
-        parts.append(await fmt.display_name_or_cached(bot, guild, uid, fallback=f"User{uid}"))
-    return "/".join(parts)
+    return "/".join(await fmt.resolve_names_batch(bot, guild, ids))
 
 def _serve_marker(serve_side: str | None) -> str:
     """Helper to display serve indicator."""
@@ -293,7 +279,7 @@ async def finalize_scoreboard_match(scoreboard_id: int) -> None:
     winner = "A" if wa > wb else "B"
 
     # Insert pending match (or directly finalize if you want to skip verification for ref-controlled games)
-    match_id = await db.insert_pending_match_points(
+    pending = await db.insert_pending_match_points(
         guild_id=sb["guild_id"],
         mode=sb["mode"],
         team_a=_parse_team_ids(sb["team_a"]),
@@ -302,6 +288,7 @@ async def finalize_scoreboard_match(scoreboard_id: int) -> None:
         reporter=sb["referee_id"],
         target_points=sb.get("target_points") or POINTS_TARGET_DEFAULT
     )
+    match_id = pending["id"]
     await db.set_status(scoreboard_id, "complete")
     try:
         await db.set_scoreboard_pending_match(scoreboard_id, match_id)
@@ -317,39 +304,42 @@ async def finalize_scoreboard_match(scoreboard_id: int) -> None:
 
 # ---- Views: 6 dropdowns (A/B) for Set 1–3 ----
 # We keep the view here to avoid import cycles; you can move to views.py if you prefer.
-def _point_options(target: int, cap: int | None) -> list[discord.SelectOption]:
+@lru_cache(maxsize=32)
+def _point_options(target: int, cap: int | None) -> tuple[discord.SelectOption, ...]:
     hi = cap or (30 if target >= 21 else 15)
-    return [discord.SelectOption(label=str(i), value=str(i)) for i in range(0, hi + 1)]
+    return tuple(discord.SelectOption(label=str(i), value=str(i)) for i in range(0, hi + 1))
 
 class _PointsSelect(discord.ui.Select):
     def __init__(self, set_idx: int, side: str, target: int, cap: int | None):
         self.set_idx, self.side = set_idx, side
-        opts = _point_options(target, cap)
-        ph = f"Set {set_idx} — {'A' if side=='A' else 'B'} points"
+        self._side_idx = 0 if side == "A" else 1
+        opts = list(_point_options(target, cap))  # shared cached options; the Select gets its own list
+        ph = f"Set {set_idx} — {side} points"
         super().__init__(placeholder=ph, min_values=1, max_values=1, options=opts)
 
     async def callback(self, interaction: discord.Interaction):
-        self.view.choices.setdefault(self.set_idx, {"A": None, "B": None})
-        self.view.choices[self.set_idx][self.side] = int(self.values[0])
+        # Acknowledge first so the 3s interaction window can't lapse while we work
         await interaction.response.defer()
+        self.view.choices[self.set_idx - 1][self._side_idx] = int(self.values[0])
 
 class PointsScoreView(discord.ui.View):
     """6 dropdowns: S1A, S1B, S2A, S2B, S3A, S3B"""
     def __init__(self, target: int, cap: int | None, on_submit):
         super().__init__(timeout=180)
         self.target, self.cap, self.on_submit = target, cap, on_submit
-        self.choices: dict[int, dict[str, int | None]] = {}
+        self.choices: list[list[int | None]] = [[None, None], [None, None], [None, None]]  # per set: [A, B]
         for s in (1, 2, 3):
             self.add_item(_PointsSelect(s, "A", target, cap))
             self.add_item(_PointsSelect(s, "B", target, cap))
 
     def _min_two_sets_filled(self) -> bool:
         done = 0
-        for s in (1, 2, 3):
-            v = self.choices.get(s)
-            if v and v.get("A") is not None and v.get("B") is not None:
+        for a, b in self.choices:
+            if a is not None and b is not None:
                 done += 1
-        return done >= 2
+                if done >= 2:
+                    return True
+        return False
 
     @discord.ui.button(label="Submit", style=discord.ButtonStyle.success)
     async def submit(self, _button, interaction: discord.Interaction):
@@ -358,11 +348,7 @@ class PointsScoreView(discord.ui.View):
                 "Please select scores for at least **two** sets.",
                 ephemeral=True
             )
-        set_scores: list[dict] = []
-        for i in (1, 2, 3):
-            v = self.choices.get(i)
-            if v and v.get("A") is not None and v.get("B") is not None:
-                set_scores.append({"A": int(v["A"]), "B": int(v["B"])})
+        set_scores = [{"A": a, "B": b} for a, b in self.choices if a is not None and b is not None]
         await self.on_submit(interaction, set_scores)
 
 # --- Discord events ---
@@ -471,7 +457,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     elif emoji == EMOJI_REJECT:  decision = "reject"
     else: return
 
-    if not await has_accepted_tos_safe(payload.user_id):
+    if not await db.has_accepted_tos(payload.user_id):
         ch = await bot.fetch_channel(payload.channel_id)
         try:
             msg = await ch.fetch_message(payload.message_id)
@@ -542,11 +528,7 @@ async def leaderboard(inter: discord.Interaction, limit: app_commands.Range[int,
 async def stats(inter: discord.Interaction, user: discord.User):
     await inter.response.defer(ephemeral=True)
 
-    async with aiosqlite.connect(db.DB_PATH) as _conn:
-        _conn.row_factory = aiosqlite.Row
-        async with _conn.execute("SELECT * FROM players WHERE user_id = ?", (user.id,)) as cur:
-            row = await cur.fetchone()
-            player = dict(row) if row else None
+    player = await db.get_player(user.id)
 
     if not player:
         display = user.display_name if getattr(user, "display_name", None) else user.name
@@ -570,16 +552,14 @@ async def stats(inter: discord.Interaction, user: discord.User):
     if matches:
         headers = ["Mode", "Team", "Sets", "Result"]
         rows = []
+        sets_by_match = await db.get_set_scores_for_matches([m["id"] for m in matches])
         for m in matches:
             mode = str(m.get("mode", ""))
             team_a_ids = _parse_team_ids(m.get("team_a") or "")
             team_b_ids = _parse_team_ids(m.get("team_b") or "")
             winner = m.get("winner")
-            try:
-                set_scores = json.loads(m.get("set_scores") or "[]")
-                sets_str = fmt.score_sets(set_scores) if set_scores else ""
-            except Exception:
-                sets_str = ""
+            set_scores = sets_by_match.get(m["id"])
+            sets_str = fmt.score_sets(set_scores) if set_scores else ""
             if not sets_str:
                 sets_str = str(m.get("set_winners") or "")
             user_team = "A" if user.id in team_a_ids else "B"
@@ -613,7 +593,7 @@ async def match_singles(inter: discord.Interaction, a: discord.User, b: discord.
         except Exception as e:
             return await i2.response.send_message(f"Invalid scores: {e}", ephemeral=True)
 
-        mid = await db.insert_pending_match_points(
+        pending = await db.insert_pending_match_points(
             guild_id=inter.guild_id or 0,
             mode="1v1",
             team_a=[a.id],
@@ -622,6 +602,7 @@ async def match_singles(inter: discord.Interaction, a: discord.User, b: discord.
             reporter=inter.user.id,
             target_points=target
         )
+        mid = pending["id"]
         await notify_verification(mid)
         # Robustly update the original view message even if the interaction token is no longer valid
         try:
@@ -688,7 +669,7 @@ async def match_doubles(
         except Exception as e:
             return await i2.response.send_message(f"Invalid scores: {e}", ephemeral=True)
 
-        mid = await db.insert_pending_match_points(
+        pending = await db.insert_pending_match_points(
             guild_id=inter.guild_id or 0,
             mode="2v2",
             team_a=[a1.id, a2.id],
@@ -697,6 +678,7 @@ async def match_doubles(
             reporter=inter.user.id,
             target_points=target
         )
+        mid = pending["id"]
         await notify_verification(mid)
         # Robustly update the original view message even if the interaction token is no longer valid
         try:
@@ -745,8 +727,7 @@ async def verify(
     name: str | None = None,
     match_id: int | None = None,
 ):
-    await db.init_db(DATABASE_PATH)
-    if not await has_accepted_tos_safe(inter.user.id):
+    if not await db.has_accepted_tos(inter.user.id):
         return await inter.response.send_message(
             "Please run `/agree_tos name:<Your Name>` first, then verify again.",
             ephemeral=True
@@ -763,7 +744,7 @@ async def verify(
 
     name = (name or (inter.user.display_name or inter.user.name))[:60]
 
-    match = await db.get_match(match_id)
+    match = await db.get_match_core(match_id)
     if not match:
         return await inter.followup.send(f"❌ Match ID {match_id} not found.", ephemeral=True)
 
@@ -811,18 +792,17 @@ async def pending(inter: discord.Interaction):
 
     headers = ["Match", "Mode", "Teams", "Sets"]
     rows = []
-    for m, _ in unsigned:
+    sets_by_match = await db.get_set_scores_for_matches([m["id"] for m, _ in unsigned])
+    teams = [(_parse_team_ids(m.get("team_a") or ""), _parse_team_ids(m.get("team_b") or "")) for m, _ in unsigned]
+    all_ids = [uid for a_ids, b_ids in teams for uid in (*a_ids, *b_ids)]
+    names = dict(zip(all_ids, await fmt.resolve_names_batch(bot, inter.guild, all_ids)))
+    for (m, _), (a_ids, b_ids) in zip(unsigned, teams):
         mid = m["id"]
         mode = m.get("mode", "")
-        a_ids = _parse_team_ids(m.get("team_a") or "")
-        b_ids = _parse_team_ids(m.get("team_b") or "")
-        a_names = [await fmt.display_name_or_cached(bot, inter.guild, uid, fallback=f"User{uid}") for uid in a_ids]
-        b_names = [await fmt.display_name_or_cached(bot, inter.guild, uid, fallback=f"User{uid}") for uid in b_ids]
-        try:
-            s = json.loads(m.get("set_scores") or "[]")
-            sets_str = fmt.score_sets(s) if s else "N/A"
-        except Exception:
-            sets_str = "N/A"
+        a_names = [names[uid] for uid in a_ids]
+        b_names = [names[uid] for uid in b_ids]
+        s = sets_by_match.get(mid)
+        sets_str = fmt.score_sets(s) if s else "N/A"
         rows.append([f"#{mid}", str(mode), f"{'/'.join(a_names)} vs {'/'.join(b_names)}", sets_str])
 
     table = fmt.mono_table(rows, headers=headers)
@@ -955,7 +935,7 @@ async def notify_verification(match_id: int, include_reporter: bool = False):
     - If include_reporter=True, also DM the reporter with an FYI-only message (no reactions, no verification row).
     - Players (non-reporters) receive actionable DMs: reactions ✅/❌ and /verify instructions.
     """
-    match = await db.get_match(match_id)
+    match = await db.get_match_core(match_id)
     if not match:
         log.error("Notify failed: match not found id=%s", match_id)
         return
@@ -969,22 +949,20 @@ async def notify_verification(match_id: int, include_reporter: bool = False):
     # Build names
     a_ids = _parse_team_ids(match.get("team_a") or "")
     b_ids = _parse_team_ids(match.get("team_b") or "")
-    a_names = [await fmt.display_name_or_cached(bot, guild, uid, fallback=f"User{uid}") for uid in a_ids]
-    b_names = [await fmt.display_name_or_cached(bot, guild, uid, fallback=f"User{uid}") for uid in b_ids]
+    names = await fmt.resolve_names_batch(bot, guild, a_ids + b_ids)
+    a_names, b_names = names[:len(a_ids)], names[len(a_ids):]
 
     # Sets summary
-    try:
-        set_scores = json.loads(match.get("set_scores") or "[]")
-    except Exception:
-        set_scores = []
+    set_scores = await db.get_set_scores(match_id)
     sets_line = fmt.score_sets(set_scores) if set_scores else "N/A"
 
     title = fmt.bold(f"Match #{match_id} pending verification")
     tip   = fmt.block("/verify decision:approve name:YourName\n/verify decision:reject  name:YourName", "md")
     body  = f"{'/'.join(a_names)} vs {'/'.join(b_names)}\n{sets_line}\n"
 
-    # Send to players (non-reporters) with reactions + verification rows
-    non_reporters = [uid for uid in participants if uid != reporter]
+    # Send to players (non-reporters) with reactions + verification rows; the bot can't DM itself
+    exclude = {reporter, _get_bot_id()}
+    non_reporters = [uid for uid in participants if uid not in exclude]
     for user_id in non_reporters:
         try:
             user = await bot.fetch_user(user_id)
@@ -1054,9 +1032,10 @@ async def _get_players_for_teams(a_ids: list[int], b_ids: list[int]) -> tuple[li
 async def _update_player_ratings(players: list[dict], new_ratings: list[float], winner: str, team: str) -> None:
     """Update ratings for non-bot players in a team."""
     bot_id = _get_bot_id()
-    for i, p in enumerate(players):
-        if p["user_id"] != bot_id:
-            await db.update_player(p["user_id"], new_ratings[i], won=(winner == team))
+    won = winner == team
+    await db.bulk_update_players(
+        [(p["user_id"], new_ratings[i], won) for i, p in enumerate(players) if p["user_id"] != bot_id]
+    )
 
 async def try_finalize_match(match_id: int):
     """
@@ -1066,7 +1045,7 @@ async def try_finalize_match(match_id: int):
       - doubles: approvals from all 3 non-reporters
     On verify: update ratings via points-share Elo and set status='verified'.
     """
-    match = await db.get_match(match_id)
+    match = await db.get_match_core(match_id)
     if not match:
         log.error("try_finalize: match not found id=%s", match_id)
         return
@@ -1083,17 +1062,15 @@ async def try_finalize_match(match_id: int):
 
     # Filter out bot from non-reporters (bot doesn't need to verify)
     bot_id = _get_bot_id()
-    non_reporters = [pid for pid in participants if pid != reporter and pid != bot_id]
+    exclude = {reporter, bot_id}
+    non_reporters = [pid for pid in participants if pid not in exclude]
     required = non_reporters[:1] if match.get("mode") == "1v1" else non_reporters
     approved_users = {s.get("user_id") for s in sigs if s.get("decision") == "approve"}
     if not all(uid in approved_users for uid in required):
         return  # still pending
 
     # Compute outcome + rating updates
-    try:
-        set_scores = json.loads(match.get("set_scores") or "[]")
-    except Exception:
-        set_scores = []
+    set_scores = await db.get_set_scores(match_id)
     target_points = match.get("target_points") or POINTS_TARGET_DEFAULT
     cap = derive_cap(target_points)
 
@@ -1135,4 +1112,8 @@ if __name__ == "__main__":
     except Exception:
         log.debug("Pre-start DB init failed", exc_info=True)
 
-    bot.run(TOKEN)
\ No newline at end of file
+    try:
+        bot.run(TOKEN)
+    finally:
+        # The shared DB connection runs on a worker thread; close it so the process can exit
+        asyncio.run(db.close_db())
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+Optional Numba kernels for the batch rating helpers in feather_rank.mmr.
+
+Importing this module never fails: if numba (or numpy) is not installed,
+AVAILABLE is False and mmr keeps using its numpy implementation. mmr imports it
+lazily; the kernels compile on their first call and nothing is written to disk.
+"""
+
+import math
+
+try:
+    import numpy as np  # type: ignore
+    from numba import njit  # type: ignore
+except ImportError:  # numba is optional
+    AVAILABLE = False
+else:
+    AVAILABLE = True
+    _LN10_OVER_400 = math.log(10.0) / 400.0
+
+    @njit(fastmath=True)
+    def _expected(ra, rb):
+        return 1.0 / (1.0 + math.exp((rb - ra) * _LN10_OVER_400))
+
+    @njit(fastmath=True)
+    def apply_team_inplace(rA, rB, score_a, k):
+        """Apply one team-Elo update per row of rA/rB (float64[:, :]), writing results in place."""
+        n_a = rA.shape[1]
+        n_b = rB.shape[1]
+        for i in range(rA.shape[0]):
+            team_a = 0.0
+            for j in range(n_a):
+                team_a += rA[i, j]
+            team_b = 0.0
+            for j in range(n_b):
+                team_b += rB[i, j]
+            # An empty team rates at the default 1200, as in mmr.team_rating
+            mean_a = team_a / n_a if n_a > 0 else 1200.0
+            mean_b = team_b / n_b if n_b > 0 else 1200.0
+            delta = k * (score_a[i] - _expected(mean_a, mean_b))
+            for j in range(n_a):
+                rA[i, j] += delta
+            for j in range(n_b):
+                rB[i, j] -= delta
@@ -11,39 +11,30 @@ async def insert_pending_match_points(
     set_scores: list[dict],
     reporter: int,
     target_points: int = 21
-) -> int:
-    """Insert a pending match with set_scores and points columns, return its ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.utcnow().isoformat()
+) -> dict:
+    """Insert a pending match with its per-set scores (match_sets).
+
+    Returns the new match's core columns (same shape as get_match_core), so callers
+    don't need a second round-trip to read it back.
+    """
+    async with _connect() as db:
         team_a_str = ",".join(map(str, team_a))
         team_b_str = ",".join(map(str, team_b))
-        set_scores_str = json.dumps(set_scores)
-        try:
-            cursor = await db.execute(
-                """
-                INSERT INTO matches (guild_id, mode, team_a, team_b, set_scores, created_at, status, reporter, created_by, points_a, points_b, set_winners, winner, target_points)
-                VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?, 0, 0, NULL, NULL, ?)
+        async with transaction(db):
+            async with db.execute(
+                f"""
+                INSERT INTO matches (guild_id, mode, team_a, team_b, created_at, status, reporter, created_by, points_a, points_b, set_winners, winner, target_points)
+                VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ','now'), 'pending', ?, ?, 0, 0, NULL, NULL, ?)
+                RETURNING {_MATCH_CORE_SQL}
                 """,
-                (guild_id, mode, team_a_str, team_b_str, set_scores_str, now, reporter, reporter, target_points)
-            )
-            await db.commit()
-        except aiosqlite.OperationalError as e:
-            if "no such table: matches" in str(e):
-                # Ensure schema then retry once
-                await init_db(DB_PATH)
-                cursor = await db.execute(
-                    """
-                    INSERT INTO matches (guild_id, mode, team_a, team_b, set_scores, created_at, status, reporter, created_by, points_a, points_b, set_winners, winner, target_points)
-                    VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?, 0, 0, NULL, NULL, ?)
-                    """,
-                    (guild_id, mode, team_a_str, team_b_str, set_scores_str, now, reporter, reporter, target_points)
-                )
-                await db.commit()
-            else:
-                raise
-    match_id = cursor.lastrowid if cursor.lastrowid is not None else -1
+                (guild_id, mode, team_a_str, team_b_str, reporter, reporter, target_points)
+            ) as cursor:
+                match = dict(zip(_MATCH_CORE_COLUMNS, await cursor.fetchone()))
+            match_id = match["id"]
+            await _insert_participants(db, match_id, team_a, team_b)
+            await _insert_sets(db, match_id, set_scores)
     log.debug("Inserted pending points match id=%s guild=%s mode=%s A=%s B=%s target=%s", match_id, guild_id, mode, team_a_str, team_b_str, target_points)
-    return match_id
+    return match
 
 async def finalize_points(
     match_id: int,
@@ -52,33 +43,50 @@ async def finalize_points(
     points_a: int,
     points_b: int
 ) -> None:
-    """Finalize a match: set winner, set_scores, points_a, points_b."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        set_scores_str = json.dumps(set_scores)
-        await db.execute(
-            """
-            UPDATE matches
-            SET winner = ?, set_scores = ?, points_a = ?, points_b = ?, status = 'verified'
-            WHERE id = ?
-            """,
-            (winner, set_scores_str, points_a, points_b, match_id)
-        )
-        await db.commit()
+    """Finalize a match: set winner, points_a, points_b and replace its match_sets rows."""
+    async with _connect() as db:
+        async with transaction(db):
+            await db.execute(
+                """
+                UPDATE matches
+                SET winner = ?, points_a = ?, points_b = ?, status = 'verified'
+                WHERE id = ?
+                """,
+                (winner, points_a, points_b, match_id)
+            )
+            await db.execute("DELETE FROM match_sets WHERE match_id = ?", (match_id,))
+            await _insert_sets(db, match_id, set_scores)
     log.debug("Finalized match id=%s winner=%s points A=%s B=%s", match_id, winner, points_a, points_b)
 
 async def get_set_scores(match_id: int) -> list[dict]:
-    """Get set_scores (as list of dict) for a match."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute("SELECT set_scores FROM matches WHERE id = ?", (match_id,)) as cursor:
-            row = await cursor.fetchone()
-            if row and row[0]:
-                try:
-                    scores = json.loads(row[0])
-                    log.debug("Fetched set_scores for match id=%s -> %s", match_id, scores)
-                    return scores
-                except Exception:
-                    return []
-            return []
+    """Get a match's set scores as [{"A": a, "B": b}, ...] in set order."""
+    async with _reader() as db:
+        async with db.execute(
+            "SELECT score_a, score_b FROM match_sets WHERE match_id = ? ORDER BY set_no",
+            (match_id,),
+        ) as cursor:
+            scores = [{"A": a, "B": b} for a, b in await cursor.fetchall()]
+    log.debug("Fetched set_scores for match id=%s -> %s", match_id, scores)
+    return scores
+
+async def get_set_scores_for_matches(match_ids: list[int]) -> dict[int, list[dict]]:
+    """Get set scores for several matches in one query, keyed by match id."""
+    out: dict[int, list[dict]] = {mid: [] for mid in match_ids}
+    if not match_ids:
+        return out
+    async with _reader() as db:
+        async with db.execute(
+            f"""
+            SELECT match_id, score_a, score_b FROM match_sets
+            WHERE match_id IN ({",".join("?" * len(match_ids))})
+            ORDER BY match_id, set_no
+            """,
+            tuple(match_ids),
+        ) as cursor:
+            async for match_id, a, b in cursor:
+                out[match_id].append({"A": a, "B": b})
+    return out
+
 # --- Pending Match and Signature/ToS Helpers ---
 from typing import Any
 
@@ -92,63 +100,73 @@ async def insert_pending_match(
     reporter: int
 ) -> int:
     """Insert a pending match and return its ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.utcnow().isoformat()
+    async with _connect() as db:
         team_a_str = ",".join(map(str, team_a))
         team_b_str = ",".join(map(str, team_b))
         set_winners_str = ",".join(set_winners)
-        cursor = await db.execute(
-            """
-            INSERT INTO matches (guild_id, mode, team_a, team_b, set_winners, winner, created_at, status, reporter, created_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?)
-            """,
-            (guild_id, mode, team_a_str, team_b_str, set_winners_str, winner, now, reporter, reporter)
-        )
-        await db.commit()
-    match_id = cursor.lastrowid if cursor.lastrowid is not None else -1
+        async with transaction(db):
+            async with db.execute(
+                """
+                INSERT INTO matches (guild_id, mode, team_a, team_b, set_winners, winner, created_at, status, reporter, created_by)
+                VALUES (?, ?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ','now'), 'pending', ?, ?)
+                RETURNING id
+                """,
+                (guild_id, mode, team_a_str, team_b_str, set_winners_str, winner, reporter, reporter)
+            ) as cursor:
+                match_id = (await cursor.fetchone())[0]
+            await _insert_participants(db, match_id, team_a, team_b)
     log.debug("Inserted pending match id=%s guild=%s mode=%s A=%s B=%s winner=%s", match_id, guild_id, mode, team_a_str, team_b_str, winner)
     return match_id
 
 async def add_signature(match_id: int, user_id: int, decision: str, signed_name: str | None) -> None:
     """Add or update a match signature."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.utcnow().isoformat()
-        await db.execute(
-            """
-            INSERT OR REPLACE INTO match_signatures (match_id, user_id, decision, signed_name, signed_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (match_id, user_id, decision, signed_name or "", now)
-        )
-        await db.commit()
+    async with _connect() as db:
+        async with transaction(db):
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO match_signatures (match_id, user_id, decision, signed_name, signed_at)
+                VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ','now'))
+                """,
+                (match_id, user_id, decision, signed_name or "")
+            )
     log.debug("Signature recorded match=%s user=%s decision=%s name=%s", match_id, user_id, decision, signed_name)
 
 async def get_match(match_id: int) -> Any:
     """Get a match row by ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("SELECT * FROM matches WHERE id = ?", (match_id,)) as cursor:
+    async with _reader() as db:
+        async with db.execute(f"SELECT {_MATCH_SQL} FROM matches WHERE id = ?", (match_id,)) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             data = dict(row) if row else None
             log.debug("Fetched match id=%s -> found=%s", match_id, bool(data))
             return data
 
+async def get_match_core(match_id: int) -> dict | None:
+    """Get only the match columns the verify/notify flows use (teams, mode, reporter, target)."""
+    async with _reader() as db:
+        async with db.execute(f"SELECT {_MATCH_CORE_SQL} FROM matches WHERE id = ?", (match_id,)) as cursor:
+            cursor.row_factory = aiosqlite.Row
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+
 async def get_match_participant_ids(match_id: int) -> list[int]:
-    """Get all participant user IDs for a match."""
-    match = await get_match(match_id)
-    if not match:
-        return []
-    # Use generator expression to avoid unnecessary list creation
-    ids = []
-    for team in (match['team_a'], match['team_b']):
-        ids.extend(int(x) for x in team.split(",") if x)
-    return ids
+    """Get all participant user IDs for a match, team A first."""
+    async with _reader() as db:
+        async with db.execute(
+            "SELECT user_id FROM match_participants WHERE match_id = ? ORDER BY team, user_id",
+            (match_id,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+    return [r[0] for r in rows]
 
 async def get_signatures(match_id: int) -> list[dict]:
     """Get all signatures for a match."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("SELECT * FROM match_signatures WHERE match_id = ?", (match_id,)) as cursor:
+    async with _reader() as db:
+        async with db.execute(
+            "SELECT match_id, user_id, decision, signed_name, signed_at FROM match_signatures WHERE match_id = ?",
+            (match_id,)
+        ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             rows = await cursor.fetchall()
             out = [dict(row) for row in rows]
             log.debug("Fetched %s signatures for match=%s", len(out), match_id)
@@ -156,30 +174,24 @@ async def get_signatures(match_id: int) -> list[dict]:
 
 async def set_match_status(match_id: int, status: str) -> None:
     """Set the status of a match."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute("UPDATE matches SET status = ? WHERE id = ?", (status, match_id))
         await db.commit()
     log.debug("Set match status id=%s status=%s", match_id, status)
 
 async def list_pending_for_user(user_id: int, guild_id: int) -> list[dict]:
     """List all pending matches for a user in a guild."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
-            """
-            SELECT * FROM matches
-            WHERE guild_id = ? AND status = 'pending' AND (
-                team_a LIKE ? OR team_a LIKE ? OR team_a LIKE ? OR
-                team_b LIKE ? OR team_b LIKE ? OR team_b LIKE ?
-            )
-            ORDER BY created_at DESC
+            f"""
+            SELECT {_MATCH_CORE_SQL_M} FROM matches m
+            JOIN match_participants p ON p.match_id = m.id
+            WHERE p.user_id = ? AND m.guild_id = ? AND m.status = 'pending'
+            ORDER BY m.id DESC
             """,
-            (
-                guild_id,
-                f"{user_id},%", f"%,{user_id},%", f"%,{user_id}",
-                f"{user_id},%", f"%,{user_id},%", f"%,{user_id}"
-            )
+            (user_id, guild_id)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             rows = await cursor.fetchall()
             out = [dict(row) for row in rows]
             log.debug("Pending matches for user=%s guild=%s -> %s", user_id, guild_id, len(out))
@@ -190,28 +202,20 @@ async def latest_pending_for_user(guild_id: int, user_id: int) -> dict | None:
 
     Conditions:
     - matches.status = 'pending'
-    - user_id appears in team_a or team_b (CSV stored IDs; supports single-member equality)
+    - user_id is a participant (match_participants)
     - reporter != user_id (cannot be the reporter)
     - user has not signed in match_signatures for that match
     Ordered by id DESC, limited to 1.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        like_params = (
-            f"{user_id},%",
-            f"%,{user_id},%",
-            f"%,{user_id}",
-        )
+    async with _reader() as db:
         query = (
-            """
-            SELECT * FROM matches m
-            WHERE m.guild_id = ?
+            f"""
+            SELECT {_MATCH_CORE_SQL_M} FROM matches m
+            JOIN match_participants p ON p.match_id = m.id
+            WHERE p.user_id = ?
+              AND m.guild_id = ?
               AND m.status = 'pending'
               AND m.reporter != ?
-              AND (
-                  m.team_a LIKE ? OR m.team_a LIKE ? OR m.team_a LIKE ? OR m.team_a = ? OR
-                  m.team_b LIKE ? OR m.team_b LIKE ? OR m.team_b LIKE ? OR m.team_b = ?
-              )
               AND NOT EXISTS (
                   SELECT 1 FROM match_signatures s
                   WHERE s.match_id = m.id AND s.user_id = ?
@@ -220,22 +224,15 @@ async def latest_pending_for_user(guild_id: int, user_id: int) -> dict | None:
             LIMIT 1
             """
         )
-        params = (
-            guild_id,
-            user_id,
-            *like_params,
-            str(user_id),
-            *like_params,
-            str(user_id),
-            user_id,
-        )
+        params = (user_id, guild_id, user_id, user_id)
         async with db.execute(query, params) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             return dict(row) if row else None
 
 async def has_accepted_tos(user_id: int) -> bool:
     """Check if a user has accepted the ToS."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _reader() as db:
         async with db.execute("SELECT 1 FROM tos_acceptances WHERE user_id = ?", (user_id,)) as cursor:
             row = await cursor.fetchone()
             accepted = bool(row)
@@ -244,66 +241,216 @@ async def has_accepted_tos(user_id: int) -> bool:
 
 async def set_tos_accepted(user_id: int, version: str = "v1", signed_name: str | None = None) -> None:
     """Upsert ToS acceptance for a user with version and signed_name."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
-            INSERT INTO tos_acceptances (user_id, accepted_at, version, signed_name)
-            VALUES (?, strftime('%Y-%m-%dT%H:%M:%fZ','now'), ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET
-                accepted_at = excluded.accepted_at,
-                version = excluded.version,
-                signed_name = COALESCE(excluded.signed_name, tos_acceptances.signed_name)
-            """,
-            (user_id, version, signed_name)
-        )
-        await db.commit()
+    async with _connect() as db:
+        async with transaction(db):
+            await db.execute(
+                """
+                INSERT INTO tos_acceptances (user_id, accepted_at, version, signed_name)
+                VALUES (?, strftime('%Y-%m-%dT%H:%M:%fZ','now'), ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    accepted_at = excluded.accepted_at,
+                    version = excluded.version,
+                    signed_name = COALESCE(excluded.signed_name, tos_acceptances.signed_name)
+                """,
+                (user_id, version, signed_name)
+            )
     log.debug("set_tos_accepted user=%s version=%s name=%s", user_id, version, signed_name)
 
 async def get_tos(user_id: int) -> dict | None:
     """Return ToS acceptance row for a user, including signed_name if present."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM tos_acceptances WHERE user_id = ?",
             (user_id,),
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             return dict(row) if row else None
 
 import aiosqlite
-from datetime import datetime
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Optional
 
-# Helper to check if a table exists
-async def table_exists(table: str, db_path: str = "feather_rank.db") -> bool:
-    async with aiosqlite.connect(db_path) as db:
-        async with db.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", 
-            (table,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            return row is not None
+# The process-wide connection, opened once by init_db and shared by every helper.
+# Only writers hold _db_lock; readers share the connection without it.
+_db: Optional[aiosqlite.Connection] = None
+_db_lock = asyncio.Lock()
+
+# Applied once to the shared connection right after init_db opens it.
+# journal_mode=WAL is persistent in the database file; the others are per-connection.
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+"""
+
+class _Session:
+    """One open `session()` block. Its helpers take turns on `lock` while the block holds _db_lock."""
+    __slots__ = ("lock", "active")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.active = True
+
+# The `session()` block the current task runs in; tasks spawned inside it inherit it
+_session: ContextVar[Optional[_Session]] = ContextVar("feather_rank_db_session", default=None)
+
+def _open(path: str) -> aiosqlite.Connection:
+    # timeout= sets SQLite's busy timeout, so writers wait on a lock instead of failing
+    return aiosqlite.connect(path, timeout=5.0, uri=path.startswith("file:"))
+
+def _current_session() -> Optional[_Session]:
+    sess = _session.get()
+    # A task that outlives its block still carries the variable; it goes back to _db_lock
+    return sess if sess is not None and sess.active else None
+
+# Helper to borrow the shared connection for one read-only helper.
+# Plain SELECTs skip _db_lock: aiosqlite queues them on the connection's worker thread
+# between a writer's statements, so reads never wait behind a whole write transaction.
+# Helpers set row_factory on their own cursors, never on the connection.
+@asynccontextmanager
+async def _reader():
+    _require_init()
+    yield _db
+
+# Helper to borrow the shared connection for one writing helper.
+# Writers take turns on _db_lock (or on the session's lock inside a `session()` block),
+# so one task's transaction never interleaves with another's.
+@asynccontextmanager
+async def _connect():
+    _require_init()
+    sess = _current_session()
+    async with (_db_lock if sess is None else sess.lock):
+        try:
+            yield _db
+        finally:
+            # A helper that failed mid-write must not leave its transaction open for the next caller
+            if _db.in_transaction:
+                await _db.rollback()
+
+@asynccontextmanager
+async def session(db_path: Optional[str] = None):
+    """
+    Hold the shared connection for every db helper awaited inside the block.
+
+    Writes from other tasks wait until the block exits, so a burst of helpers (tests,
+    batch jobs) runs back to back. Tasks spawned inside the block (gather, wait_for)
+    belong to it too and take turns on the session's own lock. Nested blocks reuse the
+    outer one. db_path, if given, must be the path init_db opened.
+    """
+    _require_init()
+    if db_path is not None and db_path != DB_PATH:
+        raise ValueError(f"session() path {db_path!r} is not the initialized database {DB_PATH!r}")
+    if _current_session() is not None:
+        yield _db
+        return
+    async with _db_lock:
+        sess = _Session()
+        token = _session.set(sess)
+        try:
+            yield _db
+        finally:
+            _session.reset(token)
+            # Let a helper still running in a spawned task finish before other writers get in
+            async with sess.lock:
+                sess.active = False
+
+# Helper to run a block of writes as a single transaction
+@asynccontextmanager
+async def transaction(db: aiosqlite.Connection):
+    """BEGIN IMMEDIATE on entry, COMMIT on success, ROLLBACK if the block raises."""
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        await db.rollback()
+        raise
+    await db.commit()
+
+# Helper to write a match's participant rows in one executemany batch.
+# Duplicate IDs are ignored: the bot may fill more than one guest slot.
+_INSERT_PARTICIPANT_SQL = (
+    "INSERT OR IGNORE INTO match_participants (match_id, user_id, team) VALUES (?, ?, ?)"
+)
+
+async def _insert_participants(db: aiosqlite.Connection, match_id: int, team_a: list[int], team_b: list[int]) -> None:
+    rows = [(match_id, uid, "A") for uid in team_a] + [(match_id, uid, "B") for uid in team_b]
+    await db.executemany(_INSERT_PARTICIPANT_SQL, rows)
+
+# Explicit column lists for match reads. The legacy set_scores JSON blob is left out:
+# set scores live in match_sets. _MATCH_CORE_COLUMNS is what list/verify flows consume.
+_MATCH_COLUMNS = (
+    "id", "guild_id", "mode", "team_a", "team_b", "set_winners", "winner", "created_by",
+    "created_at", "status", "reporter", "points_a", "points_b", "target_points",
+)
+_MATCH_CORE_COLUMNS = (
+    "id", "guild_id", "mode", "team_a", "team_b", "set_winners", "winner", "status",
+    "reporter", "target_points",
+)
+_MATCH_SQL = ", ".join(_MATCH_COLUMNS)
+_MATCH_CORE_SQL = ", ".join(_MATCH_CORE_COLUMNS)
+_MATCH_CORE_SQL_M = ", ".join(f"m.{c}" for c in _MATCH_CORE_COLUMNS)
+
+# Helper to write a match's per-set scores in one executemany batch
+_INSERT_SET_SQL = (
+    "INSERT INTO match_sets (match_id, set_no, score_a, score_b, winner) VALUES (?, ?, ?, ?, ?)"
+)
+
+def _set_rows(match_id: int, set_scores: list[dict]) -> list[tuple]:
+    rows = []
+    for set_no, s in enumerate(set_scores, start=1):
+        a, b = int(s["A"]), int(s["B"])
+        rows.append((match_id, set_no, a, b, "A" if a > b else "B" if b > a else None))
+    return rows
+
+async def _insert_sets(db: aiosqlite.Connection, match_id: int, set_scores: list[dict]) -> None:
+    await db.executemany(_INSERT_SET_SQL, _set_rows(match_id, set_scores))
+
+# Helper to check if a table exists.
+# Takes the caller's connection so it sees uncommitted DDL in the same transaction.
+async def table_exists(db: aiosqlite.Connection, table: str) -> bool:
+    async with db.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name=?", 
+        (table,)
+    ) as cursor:
+        row = await cursor.fetchone()
+        return row is not None
+
+# Helper to read a table's column names with one PRAGMA (empty set if the table is missing)
+async def table_columns(db: aiosqlite.Connection, table: str) -> set[str]:
+    async with db.execute(f"PRAGMA table_info({table})") as cursor:
+        return {row[1] for row in await cursor.fetchall()}
 
 # Helper to check if a table has a column
-async def table_has_column(table: str, column: str, db_path: str = "feather_rank.db") -> bool:
-    if not await table_exists(table, db_path):
-        return False
-    async with aiosqlite.connect(db_path) as db:
-        async with db.execute(f"PRAGMA table_info({table})") as cursor:
-            async for row in cursor:
-                if row[1] == column:
-                    return True
-    return False
+async def table_has_column(db: aiosqlite.Connection, table: str, column: str) -> bool:
+    return column in await table_columns(db, table)
 
 # Global variable for database path (will be set by init_db)
 DB_PATH = "feather_rank.db"
+# Set once init_db has created the schema; helpers refuse to run before that
+_initialized = False
+
+def _require_init() -> None:
+    if not _initialized:
+        raise RuntimeError("feather_rank.db.init_db() must be awaited before using the database")
 
 async def init_db(db_path: str = "feather_rank.db"):
     """Initialize the database with required tables and columns."""
-    global DB_PATH
-    DB_PATH = db_path
-
-    async with aiosqlite.connect(DB_PATH) as db:
+    global DB_PATH, _initialized, _db
+    if _db is None or db_path != DB_PATH:
+        await close_db()
+        DB_PATH = db_path
+        # Opened once and kept for the life of the process (this also keeps a
+        # shared-cache in-memory database alive between helper calls)
+        _db = await _open(db_path)
+        # WAL lets readers proceed while a write is in progress; NORMAL skips the per-commit fsync
+        await _db.executescript(_CONNECTION_PRAGMAS)
+
+    async with _db_lock, transaction(_db) as db:
+        # All schema work runs in one transaction: a single commit/fsync at the end
         # Create scoreboards table first (before ALTER statements)
         await db.execute(
             """
@@ -320,12 +467,16 @@ async def init_db(db_path: str = "feather_rank.db"):
             )
             """
         )
-        # Add status column to scoreboards if missing
-        if not await table_has_column("scoreboards", "status", DB_PATH):
+        scoreboard_cols = await table_columns(db, "scoreboards")
+        # Add status column to scoreboards if missing (live/complete)
+        if "status" not in scoreboard_cols:
             await db.execute("ALTER TABLE scoreboards ADD COLUMN status TEXT")
         # Add serve_side column to scoreboards if missing
-        if not await table_has_column("scoreboards", "serve_side", DB_PATH):
+        if "serve_side" not in scoreboard_cols:
             await db.execute("ALTER TABLE scoreboards ADD COLUMN serve_side TEXT")
+        # Add pending_match_id column to link the created pending match
+        if "pending_match_id" not in scoreboard_cols:
+            await db.execute("ALTER TABLE scoreboards ADD COLUMN pending_match_id INTEGER")
         # Create scoreboard_plays table
         await db.execute(
             """
@@ -347,8 +498,8 @@ async def init_db(db_path: str = "feather_rank.db"):
                 rating REAL DEFAULT 1500.0,
                 wins INTEGER DEFAULT 0,
                 losses INTEGER DEFAULT 0,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+                updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now'))
             )
         """)
 
@@ -363,38 +514,37 @@ async def init_db(db_path: str = "feather_rank.db"):
                 set_winners TEXT,
                 winner TEXT,
                 created_by INTEGER NOT NULL,
-                created_at TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
                 status TEXT CHECK(status IN ('pending','verified','rejected')) NOT NULL DEFAULT 'pending',
                 reporter INTEGER NOT NULL
             )
         """)
 
         # Add new columns to matches if missing
+        match_cols = await table_columns(db, "matches")
         # set_scores TEXT
-        if not await table_has_column("matches", "set_scores", DB_PATH):
+        if "set_scores" not in match_cols:
             await db.execute("ALTER TABLE matches ADD COLUMN set_scores TEXT")
         # points_a INT DEFAULT 0
-        if not await table_has_column("matches", "points_a", DB_PATH):
+        if "points_a" not in match_cols:
             await db.execute("ALTER TABLE matches ADD COLUMN points_a INTEGER NOT NULL DEFAULT 0")
         # points_b INT DEFAULT 0
-        if not await table_has_column("matches", "points_b", DB_PATH):
+        if "points_b" not in match_cols:
             await db.execute("ALTER TABLE matches ADD COLUMN points_b INTEGER NOT NULL DEFAULT 0")
         # target_points INT DEFAULT 21
-        if not await table_has_column("matches", "target_points", DB_PATH):
-            try:
-                await db.execute("ALTER TABLE matches ADD COLUMN target_points INTEGER DEFAULT 21")
-            except aiosqlite.OperationalError as e:
-                # Ignore duplicate column errors
-                if "duplicate column" not in str(e).lower():
-                    raise
-        
+        if "target_points" not in match_cols:
+            await db.execute("ALTER TABLE matches ADD COLUMN target_points INTEGER DEFAULT 21")
+        # Add status and reporter columns for upgrades (legacy)
+        if "status" not in match_cols:
+            await db.execute("ALTER TABLE matches ADD COLUMN status TEXT CHECK(status IN ('pending','verified','rejected')) NOT NULL DEFAULT 'pending'")
+        if "reporter" not in match_cols:
+            await db.execute("ALTER TABLE matches ADD COLUMN reporter INTEGER NOT NULL DEFAULT 0")
+
         # Migrate existing tables: make set_winners and winner nullable for point-based matches
-        # SQLite doesn't support ALTER COLUMN, so we check if recreation is needed
-        try:
-            # Test if we can insert with NULL set_winners
-            await db.execute("SELECT set_winners FROM matches WHERE set_winners IS NULL LIMIT 1")
-        except Exception:
-            # Table exists but columns aren't nullable; need to recreate
+        # SQLite doesn't support ALTER COLUMN, so read the notnull flags and recreate if needed
+        async with db.execute("PRAGMA table_info(matches)") as cursor:
+            not_null_cols = {row[1] for row in await cursor.fetchall() if row[3]}
+        if {"set_winners", "winner"} & not_null_cols:
             log.warning("Migrating matches table schema to support point-based matches...")
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS matches_new (
@@ -406,34 +556,76 @@ async def init_db(db_path: str = "feather_rank.db"):
                     set_winners TEXT,
                     winner TEXT,
                     created_by INTEGER NOT NULL,
-                    created_at TEXT NOT NULL,
+                    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
                     status TEXT CHECK(status IN ('pending','verified','rejected')) NOT NULL DEFAULT 'pending',
                     reporter INTEGER NOT NULL,
                     set_scores TEXT,
                     points_a INTEGER NOT NULL DEFAULT 0,
-                    points_b INTEGER NOT NULL DEFAULT 0
+                    points_b INTEGER NOT NULL DEFAULT 0,
+                    target_points INTEGER DEFAULT 21
                 )
             """)
             # Copy data
             await db.execute("""
-                INSERT INTO matches_new 
+                INSERT INTO matches_new (id, guild_id, mode, team_a, team_b, set_winners, winner, created_by,
+                                         created_at, status, reporter, set_scores, points_a, points_b, target_points)
                 SELECT id, guild_id, mode, team_a, team_b, set_winners, winner, created_by, created_at, 
-                       status, reporter, set_scores, points_a, points_b
+                       status, reporter, set_scores, points_a, points_b, target_points
                 FROM matches
             """)
             # Drop old and rename
             await db.execute("DROP TABLE matches")
             await db.execute("ALTER TABLE matches_new RENAME TO matches")
 
-        # Try to add status and reporter columns for upgrades (legacy)
-        try:
-            await db.execute("ALTER TABLE matches ADD COLUMN status TEXT CHECK(status IN ('pending','verified','rejected')) NOT NULL DEFAULT 'pending'")
-        except Exception:
-            pass
-        try:
-            await db.execute("ALTER TABLE matches ADD COLUMN reporter INTEGER NOT NULL DEFAULT 0")
-        except Exception:
-            pass
+        # Create match_participants table: one row per player so membership
+        # lookups are index seeks instead of LIKE scans over team_a/team_b
+        backfill_participants = not await table_exists(db, "match_participants")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS match_participants (
+                match_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                team CHAR(1) NOT NULL CHECK(team IN ('A','B')),
+                PRIMARY KEY(match_id, user_id)
+            )
+        """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_mp_user ON match_participants(user_id, match_id DESC)"
+        )
+        if backfill_participants:
+            # One-shot migration: split the CSV team columns of existing matches
+            rows = []
+            async with db.execute("SELECT id, team_a, team_b FROM matches") as cursor:
+                async for match_id, team_a, team_b in cursor:
+                    rows += [(match_id, uid, "A") for uid in map(int, filter(None, (team_a or "").split(",")))]
+                    rows += [(match_id, uid, "B") for uid in map(int, filter(None, (team_b or "").split(",")))]
+            await db.executemany(_INSERT_PARTICIPANT_SQL, rows)
+            log.info("Backfilled %s match_participants rows", len(rows))
+
+        # Create match_sets table: one row per set instead of a JSON set_scores blob
+        backfill_sets = not await table_exists(db, "match_sets")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS match_sets (
+                match_id INTEGER NOT NULL,
+                set_no INTEGER NOT NULL,
+                score_a INTEGER NOT NULL,
+                score_b INTEGER NOT NULL,
+                winner CHAR(1),
+                PRIMARY KEY(match_id, set_no)
+            )
+        """)
+        if backfill_sets:
+            # One-shot migration: unpack the legacy set_scores JSON of existing matches
+            rows = []
+            async with db.execute(
+                "SELECT id, set_scores FROM matches WHERE set_scores IS NOT NULL AND set_scores != ''"
+            ) as cursor:
+                async for match_id, set_scores in cursor:
+                    try:
+                        rows += _set_rows(match_id, json.loads(set_scores))
+                    except (ValueError, TypeError, KeyError):
+                        log.warning("Skipping unreadable set_scores for match id=%s", match_id)
+            await db.executemany(_INSERT_SET_SQL, rows)
+            log.info("Backfilled %s match_sets rows", len(rows))
 
         # Create match_signatures table
         await db.execute("""
@@ -442,7 +634,7 @@ async def init_db(db_path: str = "feather_rank.db"):
                 user_id INTEGER,
                 decision TEXT CHECK(decision IN ('approve','reject')),
                 signed_name TEXT,
-                signed_at TEXT,
+                signed_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
                 PRIMARY KEY(match_id, user_id)
             )
         """)
@@ -459,28 +651,6 @@ async def init_db(db_path: str = "feather_rank.db"):
             """
         )
 
-        # scoreboards table already created above
-
-
-        # Ensure status column for scoreboards (live/complete)
-        if not await table_has_column("scoreboards", "status", DB_PATH):
-            try:
-                await db.execute("ALTER TABLE scoreboards ADD COLUMN status TEXT")
-            except Exception:
-                pass
-        # Ensure serve_side column for scoreboards
-        if not await table_has_column("scoreboards", "serve_side", DB_PATH):
-            try:
-                await db.execute("ALTER TABLE scoreboards ADD COLUMN serve_side TEXT")
-            except Exception:
-                pass
-        # Ensure pending_match_id column to link created pending match
-        if not await table_has_column("scoreboards", "pending_match_id", DB_PATH):
-            try:
-                await db.execute("ALTER TABLE scoreboards ADD COLUMN pending_match_id INTEGER")
-            except Exception:
-                pass
-
         # Create scoreboard_sets table
         await db.execute(
             """
@@ -507,7 +677,7 @@ async def init_db(db_path: str = "feather_rank.db"):
         )
 
         # Ensure signed_name exists for older DBs
-        if not await table_has_column("tos_acceptances", "signed_name", DB_PATH):
+        if "signed_name" not in await table_columns(db, "tos_acceptances"):
             await db.execute("ALTER TABLE tos_acceptances ADD COLUMN signed_name TEXT")
 
         # Create verification_messages to track DM or channel verification prompts
@@ -530,13 +700,54 @@ async def init_db(db_path: str = "feather_rank.db"):
             """
         )
 
-        await db.commit()
-    log.debug("Initialized database at %s", DB_PATH)
+        # Indexes for the hot read paths (created after the matches migration,
+        # which rebuilds the table and would drop them).
+        # match_signatures needs none: its (match_id, user_id) primary key
+        # already serves get_signatures' match_id lookups.
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_matches_guild_created ON matches(guild_id, created_at)"
+        )
+        await db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_matches_pending ON matches(guild_id, status, id DESC)
+            WHERE status = 'pending'
+            """
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_players_rating ON players(rating DESC)"
+        )
+
+        # Refresh planner statistics so the indexes above get picked
+        await db.execute("ANALYZE")
+    _initialized = True
+    log.debug("Initialized database at %s", db_path)
+
+async def close_db() -> None:
+    """Close the shared connection; its worker thread would otherwise keep the process alive."""
+    global _db, _initialized
+    if _db is None:
+        return
+    async with _db_lock:
+        await _db.close()
+        _db = None
+        _initialized = False
+
+async def truncate_all() -> None:
+    """Delete every row from every table (schema and indexes are kept), e.g. to reset between tests."""
+    async with _connect() as db, transaction(db):
+        cur = await db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_stat%'"
+        )
+        tables = [row[0] for row in await cur.fetchall()]
+        # sqlite_sequence is included so AUTOINCREMENT ids restart at 1
+        for table in tables:
+            await db.execute(f'DELETE FROM "{table}"')
+    log.debug("Truncated %d tables at %s", len(tables), DB_PATH)
 
 async def record_verification_message(message_id: int, match_id: int, guild_id: int | None, user_id: int) -> None:
     """Record a verification message mapping to a match and recipient."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        try:
+    async with _connect() as db:
+        async with transaction(db):
             await db.execute(
                 """
                 INSERT OR REPLACE INTO verification_messages (message_id, match_id, guild_id, user_id)
@@ -544,52 +755,22 @@ async def record_verification_message(message_id: int, match_id: int, guild_id:
                 """,
                 (message_id, match_id, guild_id, user_id),
             )
-            await db.commit()
-        except aiosqlite.OperationalError as e:
-            if "no such table: verification_messages" in str(e):
-                # Create the table and retry once
-                await db.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS verification_messages (
-                        message_id INTEGER PRIMARY KEY,
-                        match_id INTEGER NOT NULL,
-                        guild_id INTEGER,
-                        user_id INTEGER NOT NULL,
-                        created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now'))
-                    )
-                    """
-                )
-                await db.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_verif_match ON verification_messages(match_id)"
-                )
-                await db.commit()
-                # Retry the insert
-                await db.execute(
-                    """
-                    INSERT OR REPLACE INTO verification_messages (message_id, match_id, guild_id, user_id)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (message_id, match_id, guild_id, user_id),
-                )
-                await db.commit()
-            else:
-                raise
     log.debug("Recorded verification_message id=%s match=%s user=%s guild=%s", message_id, match_id, user_id, guild_id)
 
 async def get_verification_message(message_id: int) -> dict | None:
     """Fetch a verification message row by message_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM verification_messages WHERE message_id = ?",
             (message_id,),
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             return dict(row) if row else None
 
 async def delete_verification_message(message_id: int) -> None:
     """Delete a verification message mapping by message_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "DELETE FROM verification_messages WHERE message_id = ?",
             (message_id,),
@@ -597,59 +778,95 @@ async def delete_verification_message(message_id: int) -> None:
         await db.commit()
     log.debug("Deleted verification_message id=%s", message_id)
 
+async def get_player(user_id: int) -> dict | None:
+    """Get a player row by user ID, or None if they have no games recorded."""
+    async with _reader() as db:
+        async with db.execute("SELECT * FROM players WHERE user_id = ?", (user_id,)) as cursor:
+            cursor.row_factory = aiosqlite.Row
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+
 async def get_or_create_player(user_id: int, username: str, base_rating: float = 1200) -> dict:
     """Get existing player or create new one."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        # Try to get existing player
+    async with _connect() as db:
+        # Single upsert: the no-op DO UPDATE keeps the stored username but makes
+        # RETURNING yield the existing row, so no follow-up SELECT is needed
         async with db.execute(
-            "SELECT * FROM players WHERE user_id = ?", (user_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                player = dict(row)
-                log.debug("Fetched existing player user_id=%s rating=%.2f", user_id, player.get("rating", 0))
-                return player
-        # Create new player
-        now = datetime.utcnow().isoformat()
-        await db.execute(
             """
             INSERT INTO players (user_id, username, rating, wins, losses, created_at, updated_at)
-            VALUES (?, ?, ?, 0, 0, ?, ?)
+            VALUES (?, ?, ?, 0, 0, strftime('%Y-%m-%dT%H:%M:%fZ','now'), strftime('%Y-%m-%dT%H:%M:%fZ','now'))
+            ON CONFLICT(user_id) DO UPDATE SET username = players.username
+            RETURNING *
             """,
-            (user_id, username, base_rating, now, now),
-        )
-        await db.commit()
-        # Return the newly created player
-        async with db.execute(
-            "SELECT * FROM players WHERE user_id = ?", (user_id,)
+            (user_id, username, base_rating),
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
-            player = dict(row) if row else {}
-            log.debug("Created new player user_id=%s rating=%.2f", user_id, player.get("rating", 0))
-            return player
+        await db.commit()
+    player = dict(row) if row else {}
+    log.debug("Fetched or created player user_id=%s rating=%.2f", user_id, player.get("rating", 0))
+    return player
 
 async def update_player(user_id: int, new_rating: float, won: bool):
     """Update player rating and win/loss count."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.utcnow().isoformat()
-        
+    async with _connect() as db:
         if won:
             await db.execute("""
                 UPDATE players 
-                SET rating = ?, wins = wins + 1, updated_at = ?
+                SET rating = ?, wins = wins + 1, updated_at = strftime('%Y-%m-%dT%H:%M:%fZ','now')
                 WHERE user_id = ?
-            """, (new_rating, now, user_id))
+            """, (new_rating, user_id))
         else:
             await db.execute("""
                 UPDATE players 
-                SET rating = ?, losses = losses + 1, updated_at = ?
+                SET rating = ?, losses = losses + 1, updated_at = strftime('%Y-%m-%dT%H:%M:%fZ','now')
                 WHERE user_id = ?
-            """, (new_rating, now, user_id))
+            """, (new_rating, user_id))
         
         await db.commit()
     log.debug("Updated player user_id=%s rating=%.2f won=%s", user_id, new_rating, won)
 
+async def bulk_upsert_players(rows: list[tuple[int, str, float, int, int]]) -> None:
+    """Insert or overwrite many players at once.
+
+    rows: (user_id, username, rating, wins, losses) tuples, written with one
+    executemany in a single transaction. created_at is kept for existing players.
+    """
+    async with _connect() as db:
+        async with transaction(db):
+            await db.executemany(
+                """
+                INSERT INTO players (user_id, username, rating, wins, losses, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ','now'), strftime('%Y-%m-%dT%H:%M:%fZ','now'))
+                ON CONFLICT(user_id) DO UPDATE SET
+                    username = excluded.username,
+                    rating = excluded.rating,
+                    wins = excluded.wins,
+                    losses = excluded.losses,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+    log.debug("Upserted %s players", len(rows))
+
+async def bulk_update_players(updates: list[tuple[int, float, bool]]) -> None:
+    """Apply many `update_player` calls in one transaction.
+
+    updates: (user_id, new_rating, won) tuples, same meaning as update_player's arguments.
+    """
+    rows = [(new_rating, int(won), int(not won), user_id) for user_id, new_rating, won in updates]
+    async with _connect() as db:
+        async with transaction(db):
+            await db.executemany(
+                """
+                UPDATE players
+                SET rating = ?, wins = wins + ?, losses = losses + ?, updated_at = strftime('%Y-%m-%dT%H:%M:%fZ','now')
+                WHERE user_id = ?
+                """,
+                rows,
+            )
+    log.debug("Updated %s players", len(rows))
+
 async def insert_match(
     guild_id: int,
     mode: str,
@@ -663,28 +880,28 @@ async def insert_match(
 
     Note: For legacy set-winner based matches. Reporter is set to created_by.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.utcnow().isoformat()
+    async with _connect() as db:
         # Convert lists to comma-separated strings
         team_a_str = ",".join(map(str, team_a))
         team_b_str = ",".join(map(str, team_b))
         set_winners_str = ",".join(set_winners)
-        cursor = await db.execute(
-            """
-            INSERT INTO matches (guild_id, mode, team_a, team_b, set_winners, winner, created_by, created_at, reporter)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (guild_id, mode, team_a_str, team_b_str, set_winners_str, winner, created_by, now, created_by),
-        )
-        await db.commit()
-        new_id = cursor.lastrowid if cursor.lastrowid is not None else -1
+        async with transaction(db):
+            async with db.execute(
+                """
+                INSERT INTO matches (guild_id, mode, team_a, team_b, set_winners, winner, created_by, created_at, reporter)
+                VALUES (?, ?, ?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ','now'), ?)
+                RETURNING id
+                """,
+                (guild_id, mode, team_a_str, team_b_str, set_winners_str, winner, created_by, created_by),
+            ) as cursor:
+                new_id = (await cursor.fetchone())[0]
+            await _insert_participants(db, new_id, team_a, team_b)
     log.debug("Inserted match id=%s guild=%s mode=%s", new_id, guild_id, mode)
     return new_id
 
 async def top_players(guild_id: int, limit: int = 10) -> list[dict]:
     """Get top players by rating, using signed_name from ToS when available."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         
         async with db.execute("""
             SELECT 
@@ -700,6 +917,7 @@ async def top_players(guild_id: int, limit: int = 10) -> list[dict]:
             ORDER BY p.rating DESC
             LIMIT ?
         """, (limit,)) as cursor:
+            cursor.row_factory = aiosqlite.Row
             rows = await cursor.fetchall()
             out = [dict(row) for row in rows]
             log.debug("Top players query limit=%s -> %s", limit, len(out))
@@ -707,48 +925,34 @@ async def top_players(guild_id: int, limit: int = 10) -> list[dict]:
 
 async def recent_matches(guild_id: int, user_id: Optional[int] = None, limit: int = 10) -> list[dict]:
     """Get recent matches, optionally filtered by user_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         
         if user_id is not None:
             # Filter matches where user_id appears in either team
             async with db.execute(
-                """
-                SELECT * FROM matches
-                WHERE guild_id = ? AND (
-                    team_a LIKE ? OR 
-                    team_a LIKE ? OR 
-                    team_a LIKE ? OR
-                    team_b LIKE ? OR 
-                    team_b LIKE ? OR 
-                    team_b LIKE ?
-                )
-                ORDER BY created_at DESC
+                f"""
+                SELECT {_MATCH_CORE_SQL_M} FROM matches m
+                JOIN match_participants p ON p.match_id = m.id
+                WHERE p.user_id = ? AND m.guild_id = ?
+                ORDER BY m.id DESC
                 LIMIT ?
                 """,
-                (
-                    guild_id,
-                    f"{user_id},%",
-                    f"%,{user_id},%",
-                    f"%,{user_id}",
-                    f"{user_id},%",
-                    f"%,{user_id},%",
-                    f"%,{user_id}",
-                    limit,
-                ),
+                (user_id, guild_id, limit),
             ) as cursor:
+                cursor.row_factory = aiosqlite.Row
                 rows = await cursor.fetchall()
         else:
             # Get all recent matches for the guild
             async with db.execute(
-                """
-                SELECT * FROM matches
+                f"""
+                SELECT {_MATCH_CORE_SQL} FROM matches
                 WHERE guild_id = ?
                 ORDER BY created_at DESC
                 LIMIT ?
                 """,
                 (guild_id, limit),
             ) as cursor:
+                cursor.row_factory = aiosqlite.Row
                 rows = await cursor.fetchall()
 
         out = [dict(row) for row in rows]
@@ -770,18 +974,19 @@ async def create_scoreboard(
     referee_id: int
 ) -> int:
     """Create a new scoreboard and return its ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         team_a_str = ",".join(map(str, team_a_ids))
         team_b_str = ",".join(map(str, team_b_ids))
-        cursor = await db.execute(
+        async with db.execute(
             """
             INSERT INTO scoreboards (guild_id, mode, target_points, cap_points, team_a, team_b, referee_id)
             VALUES (?, ?, ?, ?, ?, ?, ?)
+            RETURNING id
             """,
             (guild_id, mode, target_points, cap_points, team_a_str, team_b_str, referee_id)
-        )
+        ) as cursor:
+            scoreboard_id = (await cursor.fetchone())[0]
         await db.commit()
-        scoreboard_id = cursor.lastrowid if cursor.lastrowid is not None else -1
     log.debug(
         "Created scoreboard id=%s guild=%s mode=%s target=%s cap=%s referee=%s",
         scoreboard_id, guild_id, mode, target_points, cap_points, referee_id
@@ -797,8 +1002,7 @@ async def get_scoreboard_by_message(message_id: int) -> dict | None:
     - set_no
     - all columns from scoreboards (id, guild_id, ...)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """
             SELECT s.*, sm.scoreboard_id AS scoreboard_id, sm.set_no AS set_no
@@ -808,6 +1012,7 @@ async def get_scoreboard_by_message(message_id: int) -> dict | None:
             """,
             (message_id,)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             result = dict(row) if row else None
             log.debug("get_scoreboard_by_message message_id=%s -> %s", message_id, bool(result))
@@ -816,12 +1021,12 @@ async def get_scoreboard_by_message(message_id: int) -> dict | None:
 
 async def get_scoreboard(scoreboard_id: int) -> dict | None:
     """Get scoreboard by ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM scoreboards WHERE id = ?",
             (scoreboard_id,)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             result = dict(row) if row else None
             log.debug("get_scoreboard id=%s -> %s", scoreboard_id, bool(result))
@@ -830,12 +1035,12 @@ async def get_scoreboard(scoreboard_id: int) -> dict | None:
 
 async def get_set(scoreboard_id: int, set_no: int) -> dict | None:
     """Get a specific set by scoreboard_id and set_no."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM scoreboard_sets WHERE scoreboard_id = ? AND set_no = ?",
             (scoreboard_id, set_no)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             result = dict(row) if row else None
             log.debug("get_set scoreboard=%s set=%s -> %s", scoreboard_id, set_no, bool(result))
@@ -850,7 +1055,7 @@ async def upsert_set(
     winner: str | None
 ) -> None:
     """Insert or update a set's score and winner."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             """
             INSERT INTO scoreboard_sets (scoreboard_id, set_no, a_points, b_points, winner)
@@ -871,7 +1076,7 @@ async def upsert_set(
 
 async def record_sb_message(message_id: int, scoreboard_id: int, set_no: int) -> None:
     """Record a scoreboard message for reaction controls."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             """
             INSERT OR REPLACE INTO scoreboard_messages (message_id, scoreboard_id, set_no)
@@ -885,7 +1090,7 @@ async def record_sb_message(message_id: int, scoreboard_id: int, set_no: int) ->
 
 async def record_play(scoreboard_id: int, set_no: int, side: str, delta: int) -> None:
     """Record a play (score change) for undo functionality."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             """
             INSERT INTO scoreboard_plays (scoreboard_id, set_no, side, delta)
@@ -899,8 +1104,7 @@ async def record_play(scoreboard_id: int, set_no: int, side: str, delta: int) ->
 
 async def last_play(scoreboard_id: int, set_no: int) -> dict | None:
     """Get the most recent play for a scoreboard set."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """
             SELECT * FROM scoreboard_plays
@@ -910,6 +1114,7 @@ async def last_play(scoreboard_id: int, set_no: int) -> dict | None:
             """,
             (scoreboard_id, set_no)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             result = dict(row) if row else None
             log.debug("last_play scoreboard=%s set=%s -> %s", scoreboard_id, set_no, bool(result))
@@ -918,9 +1123,8 @@ async def last_play(scoreboard_id: int, set_no: int) -> dict | None:
 
 async def delete_last_play(scoreboard_id: int, set_no: int) -> None:
     """Delete the last play and decrement the corresponding team's score."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         # Get the last play
-        db.row_factory = aiosqlite.Row
         async with db.execute(
             """
             SELECT * FROM scoreboard_plays
@@ -930,6 +1134,7 @@ async def delete_last_play(scoreboard_id: int, set_no: int) -> None:
             """,
             (scoreboard_id, set_no)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             if not row:
                 log.debug("delete_last_play scoreboard=%s set=%s -> no play found", scoreboard_id, set_no)
@@ -969,7 +1174,7 @@ async def delete_last_play(scoreboard_id: int, set_no: int) -> None:
 
 async def set_status(scoreboard_id: int, status: str) -> None:
     """Set the status of a scoreboard."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE scoreboards SET status = ? WHERE id = ?",
             (status, scoreboard_id)
@@ -980,7 +1185,7 @@ async def set_status(scoreboard_id: int, status: str) -> None:
 
 async def set_serve_side(scoreboard_id: int, serve_side: str | None) -> None:
     """Set the serve side indicator for a scoreboard."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE scoreboards SET serve_side = ? WHERE id = ?",
             (serve_side, scoreboard_id)
@@ -991,7 +1196,7 @@ async def set_serve_side(scoreboard_id: int, serve_side: str | None) -> None:
 
 async def set_referee(scoreboard_id: int, referee_id: int) -> None:
     """Set the referee for a scoreboard."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE scoreboards SET referee_id = ? WHERE id = ?",
             (referee_id, scoreboard_id)
@@ -1002,7 +1207,7 @@ async def set_referee(scoreboard_id: int, referee_id: int) -> None:
 
 async def set_scoreboard_pending_match(scoreboard_id: int, match_id: int) -> None:
     """Store the pending match id associated with a scoreboard (for bookkeeping)."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE scoreboards SET pending_match_id = ? WHERE id = ?",
             (match_id, scoreboard_id)
@@ -5,6 +5,9 @@ Usage:
 - Production (default): concise INFO-level logs.
 - Testing: set LOG_LEVEL=DEBUG (or call setup_logging(level="DEBUG")) for very detailed logs.
 
+Call sites use %-style placeholders (log.debug("id=%s", x)) rather than f-strings,
+so disabled levels cost no formatting.
+
 Environment variables:
 - LOG_LEVEL: DEBUG|INFO|WARNING|ERROR|CRITICAL
 """
@@ -18,6 +21,19 @@ from typing import Literal, Optional
 
 LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 
+# (numeric_level, mode) of the last setup_logging call; repeat calls with the same key are no-ops
+_CONFIGURED: Optional[tuple[int, Optional[str]]] = None
+
+_FMT_VERBOSE = "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(funcName)s | %(message)s"
+_FMT_CONCISE = "%(levelname).1s %(message)s"
+# Built once; reconfiguring swaps which formatter the single stdout handler uses
+_FORMATTERS = {
+    _FMT_VERBOSE: logging.Formatter(fmt=_FMT_VERBOSE, datefmt="%H:%M:%S"),
+    # Only the verbose format has %(asctime)s; the concise one needs no datefmt
+    _FMT_CONCISE: logging.Formatter(fmt=_FMT_CONCISE),
+}
+_HANDLER: Optional[logging.Handler] = None
+
 
 def _level_from_env(default: LogLevel = "INFO") -> int:
     level_str = os.getenv("LOG_LEVEL", default).upper()
@@ -37,33 +53,38 @@ def setup_logging(level: Optional[LogLevel] = None, mode: Optional[Literal["test
         level: Optional string level (e.g., "DEBUG"). If omitted, uses LOG_LEVEL env var or INFO.
         mode: Optional mode hint ("test"|"prod") to tweak formatting; defaults based on level.
     """
+    global _CONFIGURED, _HANDLER
+
     # Determine level
     numeric_level = _level_from_env() if level is None else _level_from_env(level)
+    key = (numeric_level, mode)
+    if _CONFIGURED == key:
+        return
+
+    if _HANDLER is None:
+        _HANDLER = logging.StreamHandler(stream=sys.stdout)
 
     # Avoid duplicate handlers if re-configuring
     root = logging.getLogger()
-    if root.handlers:
-        for h in list(root.handlers):
+    for h in list(root.handlers):
+        if h is not _HANDLER:
             root.removeHandler(h)
 
     # Choose format: verbose for DEBUG, concise otherwise
     is_debug = numeric_level <= logging.DEBUG
-    fmt_verbose = (
-        "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(funcName)s | %(message)s"
-    )
-    fmt_concise = "%(levelname).1s %(message)s"
-    fmt = fmt_verbose if (mode == "test" or is_debug) else fmt_concise
-
-    handler = logging.StreamHandler(stream=sys.stdout)
-    handler.setFormatter(logging.Formatter(fmt=fmt, datefmt="%H:%M:%S"))
+    fmt = _FMT_VERBOSE if (mode == "test" or is_debug) else _FMT_CONCISE
+    _HANDLER.setFormatter(_FORMATTERS[fmt])
 
     root.setLevel(numeric_level)
-    root.addHandler(handler)
+    if _HANDLER not in root.handlers:
+        root.addHandler(_HANDLER)
 
     # Tame noisy third-party loggers unless in full debug
     logging.getLogger("discord").setLevel(logging.INFO if is_debug else logging.WARNING)
     logging.getLogger("aiosqlite").setLevel(logging.INFO if is_debug else logging.WARNING)
 
+    _CONFIGURED = key
+
 
 def get_logger(name: str) -> logging.Logger:
     """Convenience wrapper to get a module logger."""
@@ -5,6 +5,22 @@ Pure functions for calculating rating changes in 1v1 and team matches.
 
 import math
 
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # numpy is optional; only the *_batch helpers need it
+    np = None
+
+# 10 ** (x / 400) == exp(x * ln(10) / 400); exp is cheaper than a generic pow
+_LN10_OVER_400 = math.log(10.0) / 400.0
+
+# Team A's score by winner label; one dict probe instead of winner.upper() per call
+_SCORE_A_MAP = {"A": 1.0, "a": 1.0, "B": 0.0, "b": 0.0, "draw": 0.5, "DRAW": 0.5, "": 0.5}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for batch rating updates (pip install numpy)")
+
 
 def expected(ra: float, rb: float) -> float:
     """
@@ -17,7 +33,7 @@ def expected(ra: float, rb: float) -> float:
     Returns:
         Expected score (probability) for player A to win (0.0 to 1.0)
     """
-    return 1 / (1 + math.pow(10, (rb - ra) / 400))
+    return 1.0 / (1.0 + math.exp((rb - ra) * _LN10_OVER_400))
 
 
 def elo_delta(ra: float, rb: float, score_a: float, k: int = 32) -> tuple[float, float]:
@@ -56,9 +72,9 @@ def team_rating(ratings: list[float]) -> float:
     Returns:
         Team's effective rating
     """
-    if not ratings:
-        return 1200.0
-    return sum(ratings) / len(ratings)
+    n = len(ratings)
+    # fsum: one pass with exact accumulation, no drift as ratings grow
+    return 1200.0 if n == 0 else math.fsum(ratings) / n
 
 
 def apply_team_match(
@@ -83,13 +99,8 @@ def apply_team_match(
     team_a_rating = team_rating(rA)
     team_b_rating = team_rating(rB)
     
-    # Determine score
-    if winner.upper() == "A":
-        score_a = 1.0
-    elif winner.upper() == "B":
-        score_a = 0.0
-    else:  # draw
-        score_a = 0.5
+    # Determine score (anything other than A/B, e.g. "draw", counts as a draw)
+    score_a = _SCORE_A_MAP.get(winner, 0.5)
     
     # Calculate expected scores
     expected_a = expected(team_a_rating, team_b_rating)
@@ -103,9 +114,78 @@ def apply_team_match(
     
     return (new_rA, new_rB)
 
+def expected_batch(ra, rb):
+    """
+    Vectorized `expected` for many pairings at once.
+    
+    Args:
+        ra: Array of ratings for side A
+        rb: Array of ratings for side B (broadcastable against ra)
+    
+    Returns:
+        Array of expected scores for side A
+    """
+    _require_numpy()
+    ra = np.asarray(ra, dtype=np.float64)
+    rb = np.asarray(rb, dtype=np.float64)
+    return 1.0 / (1.0 + np.exp((rb - ra) * _LN10_OVER_400))
+
+
+def elo_delta_batch(ra, rb, score_a, k: float = 32):
+    """
+    Vectorized `elo_delta` for many 1v1 results at once.
+    
+    Args:
+        ra: Array of ratings for side A
+        rb: Array of ratings for side B
+        score_a: Array (or scalar) of actual scores for side A
+        k: K-factor, broadcast across all pairings
+    
+    Returns:
+        Tuple of (new_ratings_a, new_ratings_b) arrays
+    """
+    _require_numpy()
+    ra = np.asarray(ra, dtype=np.float64)
+    rb = np.asarray(rb, dtype=np.float64)
+    delta = k * (np.asarray(score_a, dtype=np.float64) - expected_batch(ra, rb))
+    return ra + delta, rb - delta
+
+
+def _team_rating_batch(r):
+    # Row means of a (M, n) array; an empty team (n == 0) rates 1200 like team_rating
+    return r.mean(axis=1) if r.shape[1] else np.full(r.shape[0], 1200.0)
+
+
+def apply_team_match_batch(rA, rB, score_a, k: float = 32):
+    """
+    Vectorized `apply_team_match` for M team matches at once.
+    
+    Args:
+        rA: 2-D array of shape (M, nA) with team A player ratings per match
+        rB: 2-D array of shape (M, nB) with team B player ratings per match
+        score_a: Array of shape (M,) with team A's score (1.0 win, 0.0 loss, 0.5 draw)
+        k: K-factor, broadcast across all matches
+    
+    Returns:
+        Tuple of (new_rA, new_rB) arrays with the same shapes as the inputs
+    """
+    _require_numpy()
+    # Imported on first use: loading numba would otherwise add about a second to every startup
+    from . import _mmr_numba
+    if _mmr_numba.AVAILABLE:
+        # JIT kernel: one native loop over all matches, updating fresh copies in place
+        new_rA = np.array(rA, dtype=np.float64)
+        new_rB = np.array(rB, dtype=np.float64)
+        _mmr_numba.apply_team_inplace(new_rA, new_rB, np.asarray(score_a, dtype=np.float64), float(k))
+        return new_rA, new_rB
+    rA = np.asarray(rA, dtype=np.float64)
+    rB = np.asarray(rB, dtype=np.float64)
+    delta = k * (np.asarray(score_a, dtype=np.float64) - expected_batch(_team_rating_batch(rA), _team_rating_batch(rB)))
+    return rA + delta[:, None], rB - delta[:, None]
+
 def expected_points_share(ra: float, rb: float) -> float:
     """Expected share of points for A vs B (Elo formula)."""
-    return 1 / (1 + 10 ** (-(ra - rb) / 400))
+    return 1.0 / (1.0 + math.exp((rb - ra) * _LN10_OVER_400))
 
 def elo_points_update(ra: float, rb: float, share_a: float, k: int = 32) -> tuple[float, float]:
     """Update ratings based on points share for A (fraction of total points won)."""
@@ -121,3 +201,21 @@ def team_points_update(ratingsA: list[float], ratingsB: list[float], share_a: fl
     dA = newA - Ra
     dB = newB - Rb
     return [r + dA for r in ratingsA], [r + dB for r in ratingsB]
+
+
+def team_points_update_batch(ratingsA, ratingsB, share_a, k: float = 32):
+    """
+    Vectorized `team_points_update` for M matches at once (e.g. replaying history).
+    
+    Args:
+        ratingsA: 2-D array of shape (M, nA) with team A player ratings per match
+        ratingsB: 2-D array of shape (M, nB) with team B player ratings per match
+        share_a: Array of shape (M,) with team A's fraction of total points won
+        k: K-factor, broadcast across all matches
+    
+    Returns:
+        Tuple of (new_ratingsA, new_ratingsB) float64 arrays
+    """
+    # Same update as a team match with score_a = share_a (expected_points_share == expected)
+    return apply_team_match_batch(ratingsA, ratingsB, share_a, k)
+
@@ -1,4 +1,10 @@
-from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass
+from typing import Any, List, Dict, Tuple, Optional
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # numpy is optional; only valid_sets_batch needs it
+    np = None
 
 def valid_set(a: int, b: int, target: int, win_by: int = 2, cap: Optional[int] = None) -> bool:
     """
@@ -21,20 +27,45 @@ def valid_set(a: int, b: int, target: int, win_by: int = 2, cap: Optional[int] =
         return True
     return d >= win_by
 
-def match_winner(
-    set_scores: List[Dict],
-    target: int,
+def valid_sets_batch(a, b, target: int, win_by: int = 2, cap: Optional[int] = None):
+    """
+    Vectorized `valid_set` for many set scores at once (e.g. bulk imports).
+    Takes integer arrays of A and B scores and returns a boolean array,
+    with the same rules as `valid_set`. Requires numpy.
+    """
+    if np is None:
+        raise ImportError("numpy is required for valid_sets_batch (pip install numpy)")
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    m = np.maximum(a, b)
+    d = np.abs(a - b)
+    ok = (a >= 0) & (b >= 0) & (m >= target)
+    if cap is None:
+        return ok & (d >= win_by)
+    # at the cap the next point wins, so the win_by margin no longer applies
+    return ok & (m <= cap) & ((m == cap) | (d >= win_by))
+
+def set_pairs(set_scores: List[Dict]) -> List[Tuple[int, int]]:
+    """
+    Converts [{"A": a, "B": b}, ...] into [(a, b), ...].
+    Do this once where set scores enter the rules layer; the tuple form
+    unpacks without per-set dict lookups.
+    """
+    return [(int(s["A"]), int(s["B"])) for s in set_scores]
+
+def match_winner_pairs(
+    pairs: List[Tuple[int, int]],
+    target: int = 21,
     win_by: int = 2,
     cap: Optional[int] = None
 ) -> Tuple[str, int, int, int, int]:
     """
-    Determines the match winner and set/point totals.
+    `match_winner` for set scores already in (a, b) tuple form.
     Returns (winner, sets_a, sets_b, points_a, points_b)
     Raises ValueError if any set is invalid.
     """
     sets_a = sets_b = pts_a = pts_b = 0
-    for s in set_scores:
-        a, b = int(s["A"]), int(s["B"])
+    for a, b in pairs:
         if not valid_set(a, b, target, win_by, cap):
             raise ValueError("Invalid set")
         pts_a += a
@@ -48,6 +79,65 @@ def match_winner(
     winner = "A" if sets_a > sets_b else "B"
     return winner, sets_a, sets_b, pts_a, pts_b
 
+def match_winner(
+    set_scores: List[Dict],
+    target: int = 21,
+    win_by: int = 2,
+    cap: Optional[int] = None
+) -> Tuple[str, int, int, int, int]:
+    """
+    Determines the match winner and set/point totals.
+    Returns (winner, sets_a, sets_b, points_a, points_b)
+    Raises ValueError if any set is invalid.
+    """
+    return match_winner_pairs(set_pairs(set_scores), target, win_by, cap)
+
+
+@dataclass
+class MatchSetArray:
+    """
+    Struct-of-arrays form of one match's set scores: a[i], b[i] are set i's points.
+    For bulk analytics/replays; the Discord layer keeps the dict form at the edges.
+    Requires numpy.
+    """
+    a: Any  # np.ndarray[int32]
+    b: Any  # np.ndarray[int32]
+
+    @classmethod
+    def from_dicts(cls, set_scores: List[Dict]) -> "MatchSetArray":
+        if np is None:
+            raise ImportError("numpy is required for MatchSetArray (pip install numpy)")
+        pairs = np.asarray(set_pairs(set_scores), dtype=np.int32).reshape(-1, 2)
+        return cls(a=pairs[:, 0].copy(), b=pairs[:, 1].copy())
+
+    def to_dicts(self) -> List[Dict]:
+        return [{"A": int(a), "B": int(b)} for a, b in zip(self.a.tolist(), self.b.tolist())]
+
+def match_winner_array(
+    sets: MatchSetArray,
+    target: int = 21,
+    win_by: int = 2,
+    cap: Optional[int] = None
+) -> Tuple[str, int, int, int, int]:
+    """
+    `match_winner` computed with array reductions over a MatchSetArray.
+    Same result as the scalar version: sets after the deciding one are ignored.
+    Returns (winner, sets_a, sets_b, points_a, points_b)
+    Raises ValueError if any counted set is invalid.
+    """
+    a, b = sets.a, sets.b
+    a_won = a > b
+    won_a = np.cumsum(a_won)
+    won_b = np.cumsum(~a_won)
+    decided = np.flatnonzero((won_a >= 2) | (won_b >= 2))
+    n = int(decided[0]) + 1 if decided.size else len(a)
+    if not valid_sets_batch(a[:n], b[:n], target, win_by, cap).all():
+        raise ValueError("Invalid set")
+    sets_a = int(won_a[n - 1]) if n else 0
+    sets_b = n - sets_a
+    winner = "A" if sets_a > sets_b else "B"
+    return winner, sets_a, sets_b, int(a[:n].sum()), int(b[:n].sum())
+
 
 def set_finished(a: int, b: int, target: int, win_by: int = 2, cap: int | None = None) -> tuple[bool, str | None]:
     """
@@ -71,17 +161,25 @@ def set_finished(a: int, b: int, target: int, win_by: int = 2, cap: int | None =
         set_finished(30, 29, 21) -> (True, 'A')   # Hit cap
         set_finished(15, 10, 21) -> (False, None)  # Neither reached target
     """
-    cap = cap or (30 if target >= 21 else 15)
+    return _set_finished(a, b, target, win_by, cap or (30 if target >= 21 else 15))
+
+
+def _set_finished(a: int, b: int, target: int, win_by: int, cap: int) -> tuple[bool, str | None]:
+    # Finished once someone reaches target and either hits the cap or leads by win_by;
+    # the leader is computed with a single compare
     m = max(a, b)
-    d = abs(a - b)
-    
-    # If neither team reached target, set is not finished
-    if m < target:
-        return (False, None)
-    
-    # If cap is reached, higher score wins immediately
-    if cap and m >= cap:
-        return (True, 'A' if a > b else 'B')
-    
-    # Otherwise, need to win by required margin
-    return (d >= win_by, 'A' if a > b else 'B' if d >= win_by else None)
+    finished = m >= target and (m >= cap or abs(a - b) >= win_by)
+    return (finished, ('A' if a > b else 'B') if finished else None)
+
+
+def make_set_finished(target: int, win_by: int = 2, cap: int | None = None):
+    """
+    Build a `set_finished(a, b)` checker with target, win_by and cap resolved once.
+    Use it when checking many scores against the same rules (e.g. in a loop).
+    """
+    cap = cap or (30 if target >= 21 else 15)
+
+    def check(a: int, b: int) -> tuple[bool, str | None]:
+        return _set_finished(a, b, target, win_by, cap)
+
+    return check
@@ -1,5 +1,8 @@
+import asyncio
 import time
-from typing import Optional, Iterable
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Optional, Iterable
 
 try:
 	import discord  # type: ignore
@@ -24,28 +27,36 @@ def mention(uid: int) -> str:
 
 
 def score_sets(sets: list[dict]) -> str:
-	return " | ".join(f"{s.get('A', 0)}–{s.get('B', 0)}" for s in sets if s)
+	return " | ".join(["%s–%s" % (s.get("A", 0), s.get("B", 0)) for s in sets if s])
 
 
 # --- Display name cache helper ---
-_NAME_CACHE: dict[tuple[Optional[int], int], tuple[float, str]] = {}
+# LRU order: hits move to the end, inserts past _MAX_CACHE_SIZE evict from the front
+_NAME_CACHE: "OrderedDict[tuple[Optional[int], int], tuple[float, str]]" = OrderedDict()
 _CACHE_TTL_SEC = 300.0  # 5 minutes
 _MAX_CACHE_SIZE = 1000  # Prevent unbounded growth
 
-
-def _clean_expired_cache():
-	"""Remove expired entries from the name cache to prevent memory bloat."""
-	now = time.time()
-	expired_keys = [k for k, v in _NAME_CACHE.items() if now - v[0] >= _CACHE_TTL_SEC]
-	for k in expired_keys:
-		del _NAME_CACHE[k]
-	
-	# If still too large, remove oldest entries
-	if len(_NAME_CACHE) > _MAX_CACHE_SIZE:
-		sorted_entries = sorted(_NAME_CACHE.items(), key=lambda x: x[1][0])
-		to_remove = len(_NAME_CACHE) - _MAX_CACHE_SIZE
-		for k, _ in sorted_entries[:to_remove]:
-			del _NAME_CACHE[k]
+# get_member/fetch_member/fetch_user resolved once per (class, name). discord's Guild and
+# Client don't support weak references, so this is keyed on the class, not the instance.
+# Only hits are cached: a class that gains the method later is picked up on the next call.
+_METHOD_CACHE: dict[tuple[type, str], Callable[..., Any]] = {}
+
+
+def _method(obj: Any, name: str) -> Optional[Callable[..., Any]]:
+	"""Return `name` as a function called with obj first (None if absent), cached per class."""
+	key = (type(obj), name)
+	fn = _METHOD_CACHE.get(key)
+	if fn is not None:
+		return fn
+	fn = getattr(type(obj), name, None)
+	if fn is not None:
+		_METHOD_CACHE[key] = fn
+		return fn
+	# Not on the class: fall back to an attribute set on the instance, looked up every call
+	attr = getattr(obj, name, None)
+	if attr is None:
+		return None
+	return lambda _obj, *args: attr(*args)
 
 
 async def display_name_or_cached(
@@ -63,7 +74,7 @@ async def display_name_or_cached(
 	- fallback: text to use if lookup fails (defaults to "User<id>")
 
 	Behavior:
-	- Checks in-memory cache keyed by (guild_id, user_id) with TTL
+	- Checks in-memory LRU cache keyed by (guild_id, user_id) with TTL
 	- Tries guild member (cache), then fetch_member, then global fetch_user
 	- Returns fallback if everything fails
 	"""
@@ -73,13 +84,10 @@ async def display_name_or_cached(
 	g_id = getattr(guild, "id", None) if guild is not None else None
 	key = (g_id, user_id)
 	now = time.time()
-	
-	# Periodically clean expired entries (every ~100 lookups)
-	if len(_NAME_CACHE) % 100 == 0:
-		_clean_expired_cache()
-	
+
 	cached = _NAME_CACHE.get(key)
 	if cached and (now - cached[0] < _CACHE_TTL_SEC):
+		_NAME_CACHE.move_to_end(key)
 		return cached[1]
 
 	name: Optional[str] = None
@@ -87,13 +95,14 @@ async def display_name_or_cached(
 	# Prefer guild nickname/display_name
 	try:
 		member = None
-		if guild is not None and hasattr(guild, "get_member"):
-			member = guild.get_member(user_id)
+		get_member = _method(guild, "get_member") if guild is not None else None
+		if get_member is not None:
+			member = get_member(guild, user_id)
 		if member is not None:
 			name = getattr(member, "display_name", None) or getattr(member, "name", None)
-		elif guild is not None and hasattr(guild, "fetch_member"):
+		elif guild is not None and (fetch_member := _method(guild, "fetch_member")) is not None:
 			try:
-				member = await guild.fetch_member(user_id)  # type: ignore[attr-defined]
+				member = await fetch_member(guild, user_id)
 				name = getattr(member, "display_name", None) or getattr(member, "name", None)
 			except Exception:
 				name = None
@@ -101,9 +110,10 @@ async def display_name_or_cached(
 		name = None
 
 	# Fallback to global user
-	if name is None and hasattr(bot, "fetch_user"):
+	fetch_user = _method(bot, "fetch_user") if name is None else None
+	if fetch_user is not None:
 		try:
-			user = await bot.fetch_user(user_id)
+			user = await fetch_user(bot, user_id)
 			name = getattr(user, "display_name", None) or getattr(user, "name", None)
 		except Exception:
 			name = None
@@ -112,9 +122,37 @@ async def display_name_or_cached(
 		name = fallback or f"User{user_id}"
 
 	_NAME_CACHE[key] = (now, name)
+	_NAME_CACHE.move_to_end(key)
+	while len(_NAME_CACHE) > _MAX_CACHE_SIZE:
+		_NAME_CACHE.popitem(last=False)
 	return name
 
 
+async def resolve_names_batch(
+	bot,
+	guild: Optional["discord.Guild"],
+	user_ids: list[int],
+) -> list[str]:
+	"""Resolve display names for many users at once, in the order given.
+
+	Cache hits return immediately; misses are looked up concurrently via
+	display_name_or_cached instead of one awaited round-trip after another.
+	Duplicate IDs are resolved once.
+	"""
+	unique = list(dict.fromkeys(user_ids))
+	names = await asyncio.gather(
+		*(display_name_or_cached(bot, guild, uid, fallback=f"User{uid}") for uid in unique)
+	)
+	by_id = dict(zip(unique, names))
+	return [by_id[uid] for uid in user_ids]
+
+
+@lru_cache(maxsize=64)
+def _row_template(widths: tuple[int, ...]) -> str:
+	"""%-format template that left-pads each cell to its column width, cached per layout."""
+	return " | ".join(f"%-{w}s" for w in widths)
+
+
 def mono_table(rows: list[list[str]], headers: Optional[list[str]] = None) -> str:
 	"""Render a simple monospaced table as a Markdown code block.
 
@@ -138,16 +176,18 @@ def mono_table(rows: list[list[str]], headers: Optional[list[str]] = None) -> st
 		headers = pad_row(headers)
 	norm_rows = [pad_row(r) for r in norm_rows]
 
-	widths = [0] * col_count
-	if headers:
-		for i, cell in enumerate(headers):
-			widths[i] = max(widths[i], len(cell))
+	# Single pass over all cells; a plain compare instead of a max() call per cell
+	widths = [len(h) for h in headers] if headers else [0] * col_count
 	for r in norm_rows:
 		for i, cell in enumerate(r):
-			widths[i] = max(widths[i], len(cell))
+			lc = len(cell)
+			if lc > widths[i]:
+				widths[i] = lc
+
+	tmpl = _row_template(tuple(widths))
 
 	def fmt_row(r: list[str]) -> str:
-		return " | ".join((r[i].ljust(widths[i]) for i in range(col_count)))
+		return tmpl % tuple(r)
 
 	lines: list[str] = []
 	if headers:
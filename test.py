@@ -16,80 +16,114 @@ async def test_database():
     # Import after setting test DB path
     from feather_rank import db
     
-    # Use test database
-    test_db_path = "test_feather_rank.db"
+    # Use an in-memory shared-cache test database (no disk writes, nothing to clean up)
+    test_db_path = "file:fr_test?mode=memory&cache=shared"
     await db.init_db(test_db_path)
     
-    try:
-        # Test 1: Create players
-        print("  ✓ Testing player creation...")
-        player1 = await db.get_or_create_player(12345, "TestPlayer1", base_rating=1200)
-        assert player1['user_id'] == 12345
-        assert player1['username'] == "TestPlayer1"
-        assert player1['rating'] == 1200
-        assert player1['wins'] == 0
-        assert player1['losses'] == 0
-        print("    ✅ Player creation works")
-        
-        # Test 2: Get existing player
-        print("  ✓ Testing get existing player...")
-        player1_again = await db.get_or_create_player(12345, "TestPlayer1")
-        assert player1_again['user_id'] == 12345
-        assert player1_again['rating'] == 1200  # Should not reset
-        print("    ✅ Get existing player works")
-        
-        # Test 3: Create more players
-        player2 = await db.get_or_create_player(67890, "TestPlayer2", base_rating=1200)
-        player3 = await db.get_or_create_player(11111, "TestPlayer3", base_rating=1200)
-        player4 = await db.get_or_create_player(22222, "TestPlayer4", base_rating=1200)
-        
-        # Test 4: Update player
-        print("  ✓ Testing player update...")
-        await db.update_player(12345, 1250.0, won=True)
-        updated_player = await db.get_or_create_player(12345, "TestPlayer1")
-        assert updated_player['rating'] == 1250.0
-        assert updated_player['wins'] == 1
-        assert updated_player['losses'] == 0
-        print("    ✅ Player update works")
-        
-        # Test 5: Insert match
-        print("  ✓ Testing match insertion...")
-        match_id = await db.insert_match(
-            guild_id=999,
-            mode="2v2",
-            team_a=[12345, 67890],
-            team_b=[11111, 22222],
-            set_winners=["A", "A"],
-            winner="A",
-            created_by=12345
-        )
-        assert match_id > 0
-        print(f"    ✅ Match inserted with ID: {match_id}")
-        
-        # Test 6: Top players
-        print("  ✓ Testing top players query...")
-        await db.update_player(67890, 1300.0, won=True)
-        await db.update_player(11111, 1150.0, won=False)
-        top = await db.top_players(guild_id=999, limit=10)
-        assert len(top) == 4
-        assert top[0]['rating'] == 1300.0  # Highest rated
-        print(f"    ✅ Top players query works (found {len(top)} players)")
-        
-        # Test 7: Recent matches
-        print("  ✓ Testing recent matches query...")
-        matches = await db.recent_matches(guild_id=999, user_id=12345, limit=5)
-        assert len(matches) == 1
-        assert matches[0]['id'] == match_id
-        print(f"    ✅ Recent matches query works (found {len(matches)} matches)")
-        
-        print("✅ All database tests passed!\n")
-        return True
-        
-    finally:
-        # Cleanup test database
-        if os.path.exists(test_db_path):
-            os.remove(test_db_path)
-            print("  🧹 Cleaned up test database")
+    # Test 1: Create players
+    print("  ✓ Testing player creation...")
+    player1 = await db.get_or_create_player(12345, "TestPlayer1", base_rating=1200)
+    assert player1['user_id'] == 12345
+    assert player1['username'] == "TestPlayer1"
+    assert player1['rating'] == 1200
+    assert player1['wins'] == 0
+    assert player1['losses'] == 0
+    print("    ✅ Player creation works")
+    
+    # Test 2: Get existing player
+    print("  ✓ Testing get existing player...")
+    player1_again = await db.get_or_create_player(12345, "TestPlayer1")
+    assert player1_again['user_id'] == 12345
+    assert player1_again['rating'] == 1200  # Should not reset
+    print("    ✅ Get existing player works")
+    
+    # Test 3: Create more players in one batch
+    await db.bulk_upsert_players([
+        (67890, "TestPlayer2", 1200, 0, 0),
+        (11111, "TestPlayer3", 1200, 0, 0),
+        (22222, "TestPlayer4", 1200, 0, 0),
+    ])
+    
+    # Test 4: Update player
+    print("  ✓ Testing player update...")
+    await db.update_player(12345, 1250.0, won=True)
+    updated_player = await db.get_or_create_player(12345, "TestPlayer1")
+    assert updated_player['rating'] == 1250.0
+    assert updated_player['wins'] == 1
+    assert updated_player['losses'] == 0
+    assert await db.get_player(12345) == updated_player
+    assert await db.get_player(424242) is None
+    print("    ✅ Player update works")
+    
+    # Test 5: Insert match
+    print("  ✓ Testing match insertion...")
+    match_id = await db.insert_match(
+        guild_id=999,
+        mode="2v2",
+        team_a=[12345, 67890],
+        team_b=[11111, 22222],
+        set_winners=["A", "A"],
+        winner="A",
+        created_by=12345
+    )
+    assert match_id > 0
+    print(f"    ✅ Match inserted with ID: {match_id}")
+    
+    # Test 6: Top players
+    print("  ✓ Testing top players query...")
+    await db.bulk_update_players([(67890, 1300.0, True), (11111, 1150.0, False)])
+    top = await db.top_players(guild_id=999, limit=10)
+    assert len(top) == 4
+    assert top[0]['rating'] == 1300.0  # Highest rated
+    assert (top[0]['wins'], top[0]['losses']) == (1, 0)
+    assert (top[-1]['user_id'], top[-1]['losses']) == (11111, 1)
+    print(f"    ✅ Top players query works (found {len(top)} players)")
+    
+    # Test 7: Recent matches
+    print("  ✓ Testing recent matches query...")
+    matches = await db.recent_matches(guild_id=999, user_id=12345, limit=5)
+    assert len(matches) == 1
+    assert matches[0]['id'] == match_id
+    print(f"    ✅ Recent matches query works (found {len(matches)} matches)")
+
+    # Test 8: Pending matches by participant
+    print("  ✓ Testing pending match lookup...")
+    pending = await db.insert_pending_match_points(
+        guild_id=999,
+        mode="1v1",
+        team_a=[12345],
+        team_b=[67890],
+        set_scores=[{"A": 21, "B": 15}, {"A": 21, "B": 18}],
+        reporter=12345
+    )
+    pending_id = pending["id"]
+    assert (pending["status"], pending["team_b"], pending["target_points"]) == ("pending", "67890", 21)
+    pending = await db.list_pending_for_user(67890, 999)
+    assert pending and pending[0]['id'] == pending_id  # newest first
+    latest = await db.latest_pending_for_user(999, 67890)
+    assert latest and latest['id'] == pending_id
+    assert await db.latest_pending_for_user(999, 12345) is None  # reporter can't verify
+    print("    ✅ Pending match lookup works")
+
+    # Test 9: Set scores round-trip
+    print("  ✓ Testing set scores storage...")
+    assert await db.get_set_scores(pending_id) == [{"A": 21, "B": 15}, {"A": 21, "B": 18}]
+    await db.finalize_points(pending_id, "A", [{"A": 21, "B": 19}, {"A": 25, "B": 23}], 46, 42)
+    by_match = await db.get_set_scores_for_matches([pending_id, match_id])
+    assert by_match == {pending_id: [{"A": 21, "B": 19}, {"A": 25, "B": 23}], match_id: []}
+    print("    ✅ Set scores storage works")
+
+    # Test 10: Reset data without rebuilding the schema
+    print("  ✓ Testing truncate_all...")
+    await db.truncate_all()
+    assert await db.top_players(guild_id=999) == []
+    assert await db.get_match(match_id) is None
+    new_player = await db.get_or_create_player(12345, "TestPlayer1")
+    assert (new_player['rating'], new_player['wins']) == (1200, 0)
+    print("    ✅ truncate_all clears data and keeps the schema")
+
+    print("✅ All database tests passed!\n")
+    return True
 
 
 def test_mmr():
@@ -105,6 +139,10 @@ def test_mmr():
     
     exp_higher = expected(1400, 1200)
     assert exp_higher > 0.7  # Higher rated player expected to win
+
+    # exp-based formula must agree with the textbook 10 ** (d / 400) form
+    for ra, rb in [(1200, 1200), (1400, 1200), (900, 2100), (1537.5, 1498.25)]:
+        assert abs(expected(ra, rb) - 1 / (1 + 10 ** ((rb - ra) / 400))) < 1e-12
     print("    ✅ Expected score calculation works")
     
     # Test 2: ELO delta
@@ -132,11 +170,108 @@ def test_mmr():
     assert new_a[0] == new_a[1]  # Same change for teammates
     assert new_b[0] == new_b[1]  # Same change for teammates
     print(f"    ✅ Team match works (Team A: {new_a[0]:.1f}, Team B: {new_b[0]:.1f})")
+
+    # Test 5: Batch path agrees with the scalar path (numpy is optional)
+    from feather_rank import mmr
+    if mmr.np is not None:
+        print("  ✓ Testing batch team match application...")
+        batch_a, batch_b = mmr.apply_team_match_batch(
+            [[1200.0, 1200.0], [1500.0, 1300.0]],
+            [[1200.0, 1200.0], [1250.0, 1250.0]],
+            [1.0, 0.0],
+            k=32,
+        )
+        scalar_a, scalar_b = apply_team_match([1500.0, 1300.0], [1250.0, 1250.0], "B", k=32)
+        assert all(abs(x - y) < 1e-9 for x, y in zip(batch_a[0], new_a))
+        assert all(abs(x - y) < 1e-9 for x, y in zip(batch_a[1], scalar_a))
+        assert all(abs(x - y) < 1e-9 for x, y in zip(batch_b[1], scalar_b))
+        pts_a, pts_b = mmr.team_points_update_batch([[1500.0, 1300.0]], [[1250.0, 1250.0]], [0.4], k=32)
+        exp_a, exp_b = mmr.team_points_update([1500.0, 1300.0], [1250.0, 1250.0], 0.4, k=32)
+        assert all(abs(x - y) < 1e-9 for x, y in zip(pts_a[0], exp_a))
+        assert all(abs(x - y) < 1e-9 for x, y in zip(pts_b[0], exp_b))
+        # An empty team rates at the default 1200 in both paths
+        empty_a, empty_b = mmr.apply_team_match_batch(mmr.np.empty((1, 0)), [[1300.0]], [0.0], k=32)
+        _, scalar_b = apply_team_match([], [1300.0], "B", k=32)
+        assert empty_a.shape == (1, 0) and abs(empty_b[0][0] - scalar_b[0]) < 1e-9
+        print("    ✅ Batch team match matches scalar results")
     
     print("✅ All MMR tests passed!\n")
     return True
 
 
+def test_rules():
+    """Test set/match scoring rules"""
+    print("🧪 Testing Scoring Rules...")
+    
+    from feather_rank.rules import set_finished, make_set_finished
+    
+    # Test 1: set_finished at the target, win-by-2 and cap boundaries
+    print("  ✓ Testing set_finished boundaries...")
+    cases = [
+        # (a, b, target, win_by, cap) -> expected
+        ((20, 18, 21, 2, None), (False, None)),  # below target
+        ((21, 19, 21, 2, None), (True, "A")),    # target reached, lead of 2
+        ((19, 21, 21, 2, None), (True, "B")),
+        ((21, 20, 21, 2, None), (False, None)),  # target reached, lead of 1
+        ((22, 20, 21, 2, None), (True, "A")),    # deuce won by 2
+        ((28, 29, 21, 2, None), (False, None)),
+        ((29, 29, 21, 2, None), (False, None)),
+        ((30, 29, 21, 2, None), (True, "A")),    # default cap 30: next point wins
+        ((29, 30, 21, 2, None), (True, "B")),
+        ((11, 10, 11, 2, None), (False, None)),
+        ((14, 14, 11, 2, None), (False, None)),
+        ((15, 14, 11, 2, None), (True, "A")),    # default cap 15 for target 11
+        ((21, 20, 21, 1, None), (True, "A")),    # win_by=1
+        ((24, 23, 21, 2, 25), (False, None)),    # explicit cap
+        ((25, 24, 21, 2, 25), (True, "A")),
+    ]
+    for (a, b, target, win_by, cap), want in cases:
+        assert set_finished(a, b, target, win_by, cap) == want, (a, b, target, win_by, cap)
+    for target, win_by, cap in [(21, 2, None), (11, 2, None), (21, 1, 25)]:
+        check = make_set_finished(target, win_by, cap)
+        for a in range(32):
+            for b in range(32):
+                assert check(a, b) == set_finished(a, b, target, win_by, cap)
+    print("    ✅ set_finished handles target, win-by and cap")
+    
+    # Test 2: Batch path agrees with the scalar path (numpy is optional)
+    from feather_rank import rules
+    if rules.np is not None:
+        print("  ✓ Testing valid_sets_batch against valid_set...")
+        grid = [(a, b) for a in range(-1, 33) for b in range(-1, 33)]
+        a_scores = [a for a, _ in grid]
+        b_scores = [b for _, b in grid]
+        for target, win_by, cap in [(21, 2, None), (21, 2, 30), (11, 2, 15), (21, 1, None), (21, 3, 25)]:
+            batch = rules.valid_sets_batch(a_scores, b_scores, target, win_by, cap).tolist()
+            assert batch == [rules.valid_set(a, b, target, win_by, cap) for a, b in grid], (target, win_by, cap)
+        print("    ✅ valid_sets_batch matches valid_set")
+        
+        print("  ✓ Testing match_winner_array against match_winner...")
+        matches = [
+            [],
+            [{"A": 21, "B": 15}, {"A": 21, "B": 18}],                      # 2-0
+            [{"A": 19, "B": 21}, {"A": 21, "B": 17}, {"A": 30, "B": 29}],  # 2-1 at the cap
+            [{"A": 15, "B": 21}, {"A": 23, "B": 25}, {"A": 21, "B": 3}],   # sets after the decider ignored
+            [{"A": 21, "B": 5}, {"A": 21, "B": 9}, {"A": 7, "B": 2}],      # invalid set after the decider ignored
+            [{"A": 21, "B": 20}, {"A": 21, "B": 9}],                       # invalid counted set
+            [{"A": 11, "B": 9}, {"A": 15, "B": 14}],
+        ]
+        for set_scores in matches:
+            for target, win_by, cap in [(21, 2, 30), (11, 2, 15), (21, 1, None)]:
+                outcomes = []
+                for fn, arg in [(rules.match_winner, set_scores),
+                                (rules.match_winner_array, rules.MatchSetArray.from_dicts(set_scores))]:
+                    try:
+                        outcomes.append(fn(arg, target, win_by, cap))
+                    except ValueError:
+                        outcomes.append(ValueError)
+                assert outcomes[0] == outcomes[1], (set_scores, target, win_by, cap, outcomes)
+        print("    ✅ match_winner_array matches match_winner")
+    
+    print("✅ All rules tests passed!\n")
+    return True
+
+
 def test_models():
     """Test data models"""
     print("🧪 Testing Data Models...")
@@ -187,11 +322,12 @@ def test_config():
         print("    ✅ .env.example exists")
     
     # Test default values
-    test_k = int(os.getenv("K_FACTOR", "32"))
+    env = os.environ
+    test_k = int(env.get("K_FACTOR", "32"))
     assert test_k == 32
     print(f"    ✅ K_FACTOR default: {test_k}")
     
-    test_db = os.getenv("DATABASE_PATH", "./smashcord.sqlite")
+    test_db = env.get("DATABASE_PATH", "./smashcord.sqlite")
     assert test_db == "./smashcord.sqlite"
     print(f"    ✅ DATABASE_PATH default: {test_db}")
     
@@ -202,28 +338,27 @@ def test_config():
 async def test_tos():
     print("🧪 Testing ToS acceptance...")
     from feather_rank import db
-    test_db_path = "test_feather_rank.db"
+    test_db_path = "file:fr_tos_test?mode=memory&cache=shared"
     await db.init_db(test_db_path)
-    user_id = 55555
-    # Should not have accepted yet
-    accepted = await db.has_accepted_tos(user_id)
-    assert not accepted, "User should not have accepted ToS yet"
-    print("  ✓ ToS not accepted by default")
-    # Accept ToS
-    await db.set_tos_accepted(user_id, version="testv1")
-    accepted = await db.has_accepted_tos(user_id)
-    assert accepted, "User should have accepted ToS after set_tos_accepted"
-    print("  ✓ ToS accepted and stored")
-    # Accept again (should not error)
-    await db.set_tos_accepted(user_id, version="testv2")
-    accepted = await db.has_accepted_tos(user_id)
-    assert accepted, "User should still have accepted ToS after re-accepting"
-    print("  ✓ ToS re-acceptance does not break")
+    # Hold the shared connection for every helper call below
+    async with db.session(test_db_path):
+        user_id = 55555
+        # Should not have accepted yet
+        accepted = await db.has_accepted_tos(user_id)
+        assert not accepted, "User should not have accepted ToS yet"
+        print("  ✓ ToS not accepted by default")
+        # Accept ToS
+        await db.set_tos_accepted(user_id, version="testv1")
+        accepted = await db.has_accepted_tos(user_id)
+        assert accepted, "User should have accepted ToS after set_tos_accepted"
+        print("  ✓ ToS accepted and stored")
+        # Accept again (should not error)
+        await db.set_tos_accepted(user_id, version="testv2")
+        accepted = await db.has_accepted_tos(user_id)
+        assert accepted, "User should still have accepted ToS after re-accepting"
+        print("  ✓ ToS re-acceptance does not break")
+        assert (await db.get_tos(user_id))["version"] == "testv2"
     print("✅ ToS tests passed!\n")
-    # Cleanup
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
-        print("  🧹 Cleaned up test database")
 
 
 async def run_all_tests():
@@ -248,21 +383,30 @@ async def run_all_tests():
         print(f"❌ MMR test failed: {e}\n")
         results.append(("MMR", False))
     
-    # Test 3: Database
+    # Test 3: Rules
+    try:
+        results.append(("Rules", test_rules()))
+    except Exception as e:
+        print(f"❌ Rules test failed: {e}\n")
+        results.append(("Rules", False))
+    
+    # Test 4: Database
+    # The DB phases run one after another: feather_rank.db keeps a single process-wide
+    # connection, so each phase's init_db() would swap the database under the other.
     try:
         results.append(("Database", await test_database()))
     except Exception as e:
         print(f"❌ Database test failed: {e}\n")
         results.append(("Database", False))
     
-    # Test 4: Config
+    # Test 5: Config
     try:
         results.append(("Config", test_config()))
     except Exception as e:
         print(f"❌ Config test failed: {e}\n")
         results.append(("Config", False))
     
-    # Test 5: ToS
+    # Test 6: ToS
     try:
         await test_tos()
         results.append(("ToS", True))
@@ -270,6 +414,10 @@ async def run_all_tests():
         print(f"❌ ToS test failed: {e}\n")
         results.append(("ToS", False))
     
+    # Release the shared DB connection; its worker thread would keep the process alive
+    from feather_rank import db
+    await db.close_db()
+    
     # Summary
     print("=" * 60)
     print("📊 Test Summary")
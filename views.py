@@ -1,58 +1,63 @@
 import discord
+from functools import lru_cache
 
-def _point_options(target: int, cap: int | None) -> list[discord.SelectOption]:
-    """Generate point options for a given target and cap."""
+@lru_cache(maxsize=32)
+def _point_options(target: int, cap: int | None) -> tuple[discord.SelectOption, ...]:
+    """Generate point options for a given target and cap (cached; callers copy into a list)."""
     hi = cap or (30 if target >= 21 else 15)
-    return [discord.SelectOption(label=str(i), value=str(i)) for i in range(0, hi + 1)]
+    return tuple(discord.SelectOption(label=str(i), value=str(i)) for i in range(0, hi + 1))
 
 def point_options(target:int, cap:int|None) -> list[discord.SelectOption]:
     """Generate point options for a given target and cap (legacy wrapper)."""
-    return _point_options(target, cap)
+    return list(_point_options(target, cap))
+
+def _two_sets_complete(choices) -> bool:
+    """True once at least two [A, B] entries are fully picked; stops at the second one."""
+    done = 0
+    for a, b in choices:
+        if a is not None and b is not None:
+            done += 1
+            if done >= 2:
+                return True
+    return False
 
 class PointsSelect(discord.ui.Select):
     def __init__(self, set_idx:int, side:str, target:int, cap:int|None):
         self.set_idx, self.side = set_idx, side  # side: "A" or "B"
+        self._side_idx = 0 if side == "A" else 1
         opts = point_options(target, cap)
-        ph = f"Set {set_idx} — {('A' if side=='A' else 'B')} points"
+        ph = f"Set {set_idx} — {side} points"
         super().__init__(placeholder=ph, min_values=1, max_values=1, options=opts)
 
     async def callback(self, interaction: discord.Interaction):
-        self.view.choices.setdefault(self.set_idx, {"A": None, "B": None})
-        self.view.choices[self.set_idx][self.side] = int(self.values[0])
+        # Acknowledge first so the 3s interaction window can't lapse while we work
         await interaction.response.defer()
+        self.view.choices[self.set_idx - 1][self._side_idx] = int(self.values[0])
 
 class PointsScoreView(discord.ui.View):
     def __init__(self, target:int, cap:int|None, on_submit):
         super().__init__(timeout=120)
         self.target, self.cap, self.on_submit = target, cap, on_submit
-        self.choices: dict[int, dict[str,int|None]] = {}
+        self.choices: list[list[int|None]] = [[None, None], [None, None], [None, None]]  # per set: [A, B]
         # 6 boxes: (S1A,S1B, S2A,S2B, S3A,S3B)
         for s in (1,2,3):
             self.add_item(PointsSelect(s, "A", target, cap))
             self.add_item(PointsSelect(s, "B", target, cap))
 
     def _sets_filled_min2(self) -> bool:
-        done = 0
-        for s in (1,2,3):
-            v = self.choices.get(s)
-            if v and v.get("A") is not None and v.get("B") is not None:
-                done += 1
-        return done >= 2
+        return _two_sets_complete(self.choices)
 
     @discord.ui.button(label="Submit", style=discord.ButtonStyle.success)
     async def submit(self, _, interaction: discord.Interaction):
         if not self._sets_filled_min2():
             return await interaction.response.send_message("Please select scores for at least **two** sets.", ephemeral=True)
-        sets = []
-        for i in (1,2,3):
-            v = self.choices.get(i)
-            if v and v.get("A") is not None and v.get("B") is not None:
-                sets.append({"A": int(v["A"]), "B": int(v["B"])});
+        sets = [{"A": a, "B": b} for a, b in self.choices if a is not None and b is not None]
         await self.on_submit(interaction, sets)
 
 # --- New pager-based scoring UI with two-tier number picker ---
 
-def _ranges_for_cap(cap:int, max_display:int|None=None) -> list[tuple[int,int]]:
+@lru_cache(maxsize=32)
+def _ranges_for_cap(cap:int, max_display:int|None=None) -> tuple[tuple[int,int], ...]:
     """
     Build compact ranges for the number picker without exceeding the 25-option
     limit of Discord selects.
@@ -64,80 +69,98 @@ def _ranges_for_cap(cap:int, max_display:int|None=None) -> list[tuple[int,int]]:
     `max_display` when provided.
 
     Examples:
-      - cap=30, max_display=21 -> [(0,10), (11,21)]
-      - cap=15, max_display=11 -> [(0,10), (11,11)]
-      - cap=15, max_display=None -> [(0,10), (11,15)]
+      - cap=30, max_display=21 -> ((0,10), (11,21))
+      - cap=15, max_display=11 -> ((0,10), (11,11))
+      - cap=15, max_display=None -> ((0,10), (11,15))
     """
     m = min(cap, max_display) if max_display is not None else cap
     if m <= 15:
-        return [(0,10), (11,m)]
+        return ((0,10), (11,m))
     if m <= 21:
-        return [(0,10), (11,m)]
+        return ((0,10), (11,m))
     # If the maximum exceeds 21, split off the deuce/high band
-    return [(0,10), (11,21), (22,m)]
+    return ((0,10), (11,21), (22,m))
+
+# The picker's range and exact-number options only depend on the bounds, so every
+# NumberPicker (and every range/exact switch) reuses the same prebuilt SelectOptions.
+@lru_cache(maxsize=32)
+def _range_select_options(cap:int, max_display:int|None) -> tuple[discord.SelectOption, ...]:
+    return tuple(discord.SelectOption(label=f"{lo}–{hi}", value=f"R:{lo}:{hi}") for lo,hi in _ranges_for_cap(cap, max_display))
+
+@lru_cache(maxsize=64)
+def _clear_option(value:int) -> discord.SelectOption:
+    return discord.SelectOption(label=f"Clear (was {value})", value="CLR")
+
+@lru_cache(maxsize=32)
+def _exact_select_options(lo:int, hi:int) -> tuple[discord.SelectOption, ...]:
+    return tuple(discord.SelectOption(label=str(i), value=f"N:{i}") for i in range(lo, hi+1))
 
 class NumberPicker(discord.ui.Select):
     def __init__(self, set_idx:int, side:str, target:int, cap:int|None, value:int|None=None, row:int|None=None):
         self.set_idx, self.side = set_idx, side
+        self._side_idx = 0 if side == "A" else 1
         self.cap = cap or (30 if target >= 21 else 15)
         # Limit the UI picker to the target by default (e.g., 0–21), to avoid
         # showing the 22–30 band in the first step. Users can still submit
         # deuce scores via the dedicated paired-score selector.
         self.max_display = min(self.cap, target)
+        self._static_range_opts = _range_select_options(self.cap, self.max_display)
         self._value = value
+        self._ph_base = f"Set {set_idx} — {side} points"
         self.mode = "range"  # or "exact"
         self.current_range: tuple[int,int] | None = None
         super().__init__(placeholder=self._ph(), min_values=1, max_values=1, options=self._range_options(), row=row)
 
     def _ph(self) -> str:
-        suffix = f" (picked {self._value})" if self._value is not None else ""
-        who = "A" if self.side == "A" else "B"
-        return f"Set {self.set_idx} — {who} points{suffix}"
+        return self._ph_base if self._value is None else f"{self._ph_base} (picked {self._value})"
 
     def _range_options(self):
-        opts = [discord.SelectOption(label=f"{lo}–{hi}", value=f"R:{lo}:{hi}") for lo,hi in _ranges_for_cap(self.cap, self.max_display)]
-        if self._value is not None:
-            opts.append(discord.SelectOption(label=f"Clear (was {self._value})", value="CLR"))
-        return opts
+        if self._value is None:
+            return list(self._static_range_opts)
+        return [*self._static_range_opts, _clear_option(self._value)]
 
     def _exact_options(self, lo:int, hi:int):
-        return [discord.SelectOption(label=str(i), value=f"N:{i}") for i in range(lo, hi+1)]
+        return list(_exact_select_options(lo, hi))
 
     async def _to_exact(self, interaction: discord.Interaction, lo:int, hi:int):
         self.mode = "exact"
         self.current_range = (lo, hi)
         self.options = self._exact_options(lo, hi)
         self.placeholder = self._ph()
-        await interaction.response.edit_message(view=self.view)
+        await interaction.edit_original_response(view=self.view)
 
-    async def _to_range(self, interaction: discord.Interaction):
+    def _show_range(self):
         self.mode = "range"
         self.current_range = None
         self.options = self._range_options()
         self.placeholder = self._ph()
-        await interaction.response.edit_message(view=self.view)
+
+    async def _to_range(self, interaction: discord.Interaction):
+        self._show_range()
+        await interaction.edit_original_response(view=self.view)
 
     async def callback(self, interaction: discord.Interaction):
+        # Acknowledge first; the mode switches below edit the original message afterwards
+        await interaction.response.defer()
         v = self.values[0]
         if v == "CLR":
             self._value = None
             view = getattr(self, "view", None)
             if view is not None:
-                view.choices.setdefault(self.set_idx, {"A": None, "B": None})
-                view.choices[self.set_idx][self.side] = None
+                view.choices[self.set_idx - 1][self._side_idx] = None
             await self._to_range(interaction)
             return
-        if v.startswith("R:"):
-            _, lo, hi = v.split(":")
+        tag = v[0]  # "R:lo:hi" or "N:i"; the first character picks the branch
+        if tag == "R":
+            lo, _, hi = v[2:].partition(":")
             await self._to_exact(interaction, int(lo), int(hi))
             return
-        if v.startswith("N:"):
-            num = int(v.split(":")[1])
+        if tag == "N":
+            num = int(v[2:])
             self._value = num
             view = getattr(self, "view", None)
             if view is not None:
-                view.choices.setdefault(self.set_idx, {"A": None, "B": None})
-                view.choices[self.set_idx][self.side] = num
+                view.choices[self.set_idx - 1][self._side_idx] = num
             await self._to_range(interaction)
             return
 
@@ -145,81 +168,116 @@ class PointsScorePagerView(discord.ui.View):
     def __init__(self, target:int, cap:int|None, on_submit):
         super().__init__(timeout=180)
         self.target, self.cap, self.on_submit = target, cap, on_submit
-        self.choices = {1: {"A": None, "B": None}, 2: {"A": None, "B": None}, 3: {"A": None, "B": None}}
+        self.choices: list[list[int|None]] = [[None, None], [None, None], [None, None]]  # per set: [A, B]
         self.page = 1
+        # Components are built once and re-attached on page flips; pickers are created per set on first visit
+        self._pickers: dict[int, tuple[NumberPicker, NumberPicker]] = {}
+        self._back = discord.ui.Button(label="◀ Back", style=discord.ButtonStyle.secondary, row=2)
+        self._back.callback = self._on_back
+        self._next = discord.ui.Button(label="Next ▶", style=discord.ButtonStyle.primary, row=2)
+        self._next.callback = self._on_next
+        self._submit = discord.ui.Button(label="Submit", style=discord.ButtonStyle.success, row=2)
+        self._submit.callback = self._on_submit
         self._render()
 
-    def _complete_sets_count(self) -> int:
-        return sum(1 for i in (1,2,3) if self.choices[i]["A"] is not None and self.choices[i]["B"] is not None)
+    def _sets_filled_min2(self) -> bool:
+        return _two_sets_complete(self.choices)
+
+    def _page_pickers(self, s:int) -> tuple[NumberPicker, NumberPicker]:
+        pickers = self._pickers.get(s)
+        if pickers is None:
+            a, b = self.choices[s - 1]
+            pickers = self._pickers[s] = (
+                NumberPicker(s, "A", self.target, self.cap, value=a, row=0),
+                NumberPicker(s, "B", self.target, self.cap, value=b, row=1),
+            )
+        else:
+            # A picker left mid-way through an exact-number pick comes back in range mode
+            for picker in pickers:
+                if picker.mode != "range":
+                    picker._show_range()
+        return pickers
 
     def _render(self):
         self.clear_items()
-        s = self.page
-        self.add_item(NumberPicker(s, "A", self.target, self.cap, value=self.choices[s]["A"], row=0))
-        self.add_item(NumberPicker(s, "B", self.target, self.cap, value=self.choices[s]["B"], row=1))
+        for picker in self._page_pickers(self.page):
+            self.add_item(picker)
         # nav row
         if self.page > 1:
-            back = discord.ui.Button(label="◀ Back", style=discord.ButtonStyle.secondary, row=2)
-            async def _back(interaction:discord.Interaction):
-                self.page -= 1
-                self._render()
-                await interaction.response.edit_message(view=self)
-            back.callback = _back
-            self.add_item(back)
-        if self.page < 3:
-            nxt = discord.ui.Button(label="Next ▶", style=discord.ButtonStyle.primary, row=2)
-            async def _next(interaction:discord.Interaction):
-                self.page += 1
-                self._render()
-                await interaction.response.edit_message(view=self)
-            nxt.callback = _next
-            self.add_item(nxt)
-        else:
-            submit = discord.ui.Button(label="Submit", style=discord.ButtonStyle.success, row=2)
-            async def _submit(interaction:discord.Interaction):
-                if self._complete_sets_count() < 2:
-                    return await interaction.response.send_message("Please enter scores for at least **two** sets.", ephemeral=True)
-                sets = []
-                for idx in (1,2,3):
-                    a, b = self.choices[idx]["A"], self.choices[idx]["B"]
-                    if a is not None and b is not None:
-                        sets.append({"A": int(a), "B": int(b)})
-                await self.on_submit(interaction, sets)
-            submit.callback = _submit
-            self.add_item(submit)
-def gen_standard_scores(target: int) -> list[tuple[str, int, int]]:
+            self.add_item(self._back)
+        self.add_item(self._next if self.page < 3 else self._submit)
+
+    async def _on_back(self, interaction:discord.Interaction):
+        await interaction.response.defer()
+        self.page -= 1
+        self._render()
+        await interaction.edit_original_response(view=self)
+
+    async def _on_next(self, interaction:discord.Interaction):
+        await interaction.response.defer()
+        self.page += 1
+        self._render()
+        await interaction.edit_original_response(view=self)
+
+    async def _on_submit(self, interaction:discord.Interaction):
+        if not self._sets_filled_min2():
+            return await interaction.response.send_message("Please enter scores for at least **two** sets.", ephemeral=True)
+        sets = [{"A": a, "B": b} for a, b in self.choices if a is not None and b is not None]
+        await self.on_submit(interaction, sets)
+
+@lru_cache(maxsize=16)
+def gen_standard_scores(target: int) -> tuple[tuple[str, int, int], ...]:
     """Generate standard (non-deuce) score options for set selection.
     
-    Returns list of (winner, score_a, score_b) tuples.
+    Returns a tuple of (winner, score_a, score_b) tuples, cached per target
+    since every score view rebuilds the same options.
     Example: target=21 generates 21-0, 21-1, ..., 21-10 for A and B wins.
     """
-    std = []
-    # A wins: target–0 through target–(target-11)
-    for x in range(0, max(0, target - 10)):
-        std.append(("A", target, x))
-    # B wins: 0–target through (target-11)–target
-    for x in range(0, max(0, target - 10)):
-        std.append(("B", x, target))
-    return std
+    n = max(0, target - 10)
+    # A wins: target–0 through target–(target-11), then B wins: 0–target through (target-11)–target
+    return tuple([("A", target, x) for x in range(n)] + [("B", x, target) for x in range(n)])
 
 
-def gen_deuce_scores(target: int, win_by: int = 2, cap: int | None = None) -> list[tuple[str, int, int]]:
+@lru_cache(maxsize=16)
+def gen_deuce_scores(target: int, win_by: int = 2, cap: int | None = None) -> tuple[tuple[str, int, int], ...]:
     """Generate deuce/high score options beyond standard scores.
     
-    Returns list of (winner, score_a, score_b) tuples for close games.
+    Returns a tuple of (winner, score_a, score_b) tuples for close games, cached per arguments.
     Example: 22-20, 23-21, etc. up to cap.
     """
-    scores = []
     # e.g., 22–20, 23–21, ... up to cap or until it stops making sense
     top = cap if cap else target + 9  # default 30 for 21, 15 for 11 via caller
+    scores = []
     for m in range(target + 1, top + 1):
-        a, b = m, m - win_by
-        scores.append(("A", a, b))
-        scores.append(("B", b, a))
-    return scores
+        scores += (("A", m, m - win_by), ("B", m - win_by, m))
+    return tuple(scores)
 
 
-import discord
+# Score SelectOptions per (set_idx, target[, cap]); only a handful of combinations ever occur,
+# so each view just copies a prebuilt tuple instead of formatting ~25 options.
+# "More…" entry that switches a set to the deuce picker; one shared instance per set index
+_MORE_OPTIONS = {i: discord.SelectOption(label="More (deuce & high scores)…", value=f"DEUCE:{i}") for i in (1, 2, 3)}
+
+
+@lru_cache(maxsize=32)
+def _std_options(set_idx: int, target: int) -> tuple[discord.SelectOption, ...]:
+    # Standard page (<=25 options total)
+    prefix = f"Set {set_idx}: "
+    opts = [
+        discord.SelectOption(label=f"{prefix}{a}–{b}", value=f"{set_idx}:{a}:{b}")
+        for _, a, b in gen_standard_scores(target)[:24]
+    ]
+    opts.append(_MORE_OPTIONS[set_idx])
+    return tuple(opts)
+
+
+@lru_cache(maxsize=32)
+def _deuce_options(set_idx: int, target: int, cap: int | None) -> tuple[discord.SelectOption, ...]:
+    prefix = f"Set {set_idx}: "
+    return tuple(
+        discord.SelectOption(label=f"{prefix}{a}–{b}", value=f"{set_idx}:{a}:{b}")
+        for _, a, b in gen_deuce_scores(target, 2, cap)[:25]
+    )
 
 
 class SetScoreSelect(discord.ui.Select):
@@ -227,52 +285,37 @@ class SetScoreSelect(discord.ui.Select):
         self.set_idx = set_idx
         self.target = target
         self.cap = cap
-        opts = []
-        # Standard page (<=25 options total)
-        for side, a, b in gen_standard_scores(target):
-            label = f"Set {set_idx}: {a}–{b}" if side == "A" else f"Set {set_idx}: {a}–{b}"
-            value = f"{set_idx}:{a}:{b}"
-            opts.append(discord.SelectOption(label=label, value=value))
-            if len(opts) >= 24:
-                break
-        opts.append(discord.SelectOption(label="More (deuce & high scores)…", value=f"DEUCE:{set_idx}"))
+        opts = list(_std_options(set_idx, target))
         super().__init__(placeholder=f"Set {set_idx} score", min_values=1, max_values=1, options=opts)
 
     async def callback(self, interaction: discord.Interaction):
+        # Acknowledge first so the 3s interaction window can't lapse while we work
+        await interaction.response.defer()
         v = self.values[0]
+        view = getattr(self, "view", None)
         if v.startswith("DEUCE:"):
-            view = getattr(self, "view", None)
             if view is not None and hasattr(view, "show_deuce_for"):
                 await view.show_deuce_for(self.set_idx, interaction)
-            else:
-                await interaction.response.defer()
             return
-        view = getattr(self, "view", None)
         if view is not None and hasattr(view, "store_choice"):
-            view.store_choice(v)
-            await interaction.response.edit_message(view=view)
-        else:
-            await interaction.response.defer()
+            _, a, b = v.split(":")  # "set:a:b"; the set is this select's own
+            view.store_choice(self.set_idx, int(a), int(b))
+            await interaction.edit_original_response(view=view)
 
 
 class DeuceScoreSelect(discord.ui.Select):
     def __init__(self, set_idx: int, target: int, cap: int | None):
         self.set_idx = set_idx
-        opts = []
-        for side, a, b in gen_deuce_scores(target, 2, cap):
-            label = f"Set {set_idx}: {a}–{b}"
-            opts.append(discord.SelectOption(label=label, value=f"{set_idx}:{a}:{b}"))
-            if len(opts) >= 25:
-                break
+        opts = list(_deuce_options(set_idx, target, cap))
         super().__init__(placeholder=f"Set {set_idx} deuce score", min_values=1, max_values=1, options=opts)
 
     async def callback(self, interaction: discord.Interaction):
+        await interaction.response.defer()
         view = getattr(self, "view", None)
         if view is not None and hasattr(view, "store_choice") and hasattr(view, "show_standard"):
-            view.store_choice(self.values[0])
+            _, a, b = self.values[0].split(":")  # "set:a:b"
+            view.store_choice(self.set_idx, int(a), int(b))
             await view.show_standard(interaction)  # go back to main view
-        else:
-            await interaction.response.defer()
 
 
 class ScoreSelectView(discord.ui.View):
@@ -281,7 +324,8 @@ class ScoreSelectView(discord.ui.View):
         self.target = target
         self.cap = cap
         self.on_submit = on_submit
-        self.choices = {}  # key set_idx -> (A,B)
+        self.choices: list[tuple[int, int] | None] = [None, None, None]  # per set: (A, B) once picked
+        self._filled_mask = 0  # bit set_idx is set once that set has a score
         # 3 set selectors
         self.set1 = SetScoreSelect(1, target, cap)
         self.set2 = SetScoreSelect(2, target, cap)
@@ -299,19 +343,18 @@ class ScoreSelectView(discord.ui.View):
     def _update_submit_button(self):
         """Update submit button state based on whether Set 1 and Set 2 are filled."""
         if self.submit_button:
-            # Disable if Set 1 or Set 2 is missing
-            self.submit_button.disabled = not (1 in self.choices and 2 in self.choices)
+            # Disable if Set 1 or Set 2 is missing (bits 1 and 2 of the mask)
+            self.submit_button.disabled = (self._filled_mask & 0b110) != 0b110
 
-    def store_choice(self, value: str):
-        _, a, b = value.split(":")  # "set:a:b"
-        s = int(value.split(":")[0])
-        self.choices[s] = (int(a), int(b))
+    def store_choice(self, set_idx: int, a: int, b: int):
+        self.choices[set_idx - 1] = (a, b)
+        self._filled_mask |= 1 << set_idx
         self._update_submit_button()
 
     async def show_deuce_for(self, set_idx: int, interaction: discord.Interaction):
         self.clear_items()
         self.add_item(DeuceScoreSelect(set_idx, self.target, self.cap))
-        await interaction.response.edit_message(view=self)
+        await interaction.edit_original_response(view=self)
 
     async def show_standard(self, interaction: discord.Interaction):
         self.clear_items()
@@ -320,13 +363,9 @@ class ScoreSelectView(discord.ui.View):
         if self.submit_button:
             self.add_item(self.submit_button)
         self._update_submit_button()  # Update button state
-        await interaction.response.edit_message(view=self)
+        await interaction.edit_original_response(view=self)
 
     @discord.ui.button(label="Submit", style=discord.ButtonStyle.success, disabled=True)
     async def submit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        sets = []
-        for i in (1, 2, 3):
-            if i in self.choices:
-                a, b = self.choices[i]
-                sets.append({"A": a, "B": b})
+        sets = [{"A": a, "B": b} for a, b in filter(None, self.choices)]
         await self.on_submit(interaction, sets)